@@ -0,0 +1,14 @@
+"""
+Benchmark suite.
+
+Timed, headless scenarios for the load, view update and render paths, with
+statistical summaries and baseline files for comparing runs across commits.
+Run from the project root:
+
+    python -m bench                          # every scenario
+    python -m bench update_panels player_move
+    python -m bench --save before.json       # record a baseline
+    python -m bench --compare before.json    # compare against it
+"""
+from .harness import SCENARIOS, scenario, run, summarize, save_baseline, load_baseline, compare
+from . import scenarios
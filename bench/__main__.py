@@ -0,0 +1,64 @@
+"""
+Command line entry point: python -m bench [scenario ...] [options]
+"""
+import argparse
+import os
+import sys
+
+# Baseline paths are relative to where the suite was started
+LAUNCH_DIR = os.getcwd()
+
+# Run from the project root (assets and data are loaded relative to it)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.chdir(os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from bench import SCENARIOS, run, save_baseline, load_baseline, compare
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m bench', description='Run the benchmark suite')
+    parser.add_argument('scenarios', nargs='*', help='scenarios to run (default: all)')
+    parser.add_argument('--repeat', type=int, help='timed samples per scenario')
+    parser.add_argument('--save', metavar='FILE', help='write results to a baseline file')
+    parser.add_argument('--compare', metavar='FILE', help='compare against a baseline file')
+    parser.add_argument('--list', action='store_true', help='list scenarios and exit')
+    args = parser.parse_args()
+
+    width = max(16, max(len(name) for name in SCENARIOS) + 2)
+    if args.list:
+        for name, bench in SCENARIOS.items():
+            print(f"{name:<{width}}{bench.description}")
+        return
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    baseline = None
+    if args.compare:
+        baseline = load_baseline(os.path.join(LAUNCH_DIR, args.compare))['results']
+
+    print(f"{'Scenario':<{width}}{'Ops':>7}{'Median us':>12}{'p95 us':>12}{'Stdev us':>11}{'Ops/s':>12}"
+          + (f"{'vs base':>10}" if baseline else ''))
+
+    results = {}
+    for name in names:
+        summary = results[name] = run(name, repeat=args.repeat)
+        line = (f"{name:<{width}}{summary['ops']:>7}{summary['median'] * 1e6:>12.1f}"
+                f"{summary['p95'] * 1e6:>12.1f}{summary['stdev'] * 1e6:>11.1f}"
+                f"{summary['ops_per_sec']:>12.1f}")
+        if baseline:
+            ratio, verdict = compare({name: summary}, baseline)[name]
+            line += f"{'new':>10}" if ratio is None else f"{ratio:>9.2f}x {verdict}"
+        print(line, flush=True)
+
+    if args.save:
+        save_baseline(os.path.join(LAUNCH_DIR, args.save), results)
+        print(f"Saved baseline to {args.save}")
+
+
+if __name__ == '__main__':
+    main()
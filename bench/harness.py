@@ -0,0 +1,176 @@
+"""
+Timing, statistics and baseline files for the benchmark suite.
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+import pygame as pg
+
+
+# Scenario name -> Scenario, in registration order
+SCENARIOS = {}
+
+# Relative change in median time reported as a regression/improvement
+THRESHOLD = 0.10
+
+
+class Scenario(object):
+    """
+    A timed benchmark.
+
+    Attributes:
+        name: Scenario name
+        setup: Called once with no arguments; returns (func, ops) where func
+            runs one sample and ops is the number of operations it performs.
+            If func returns a number, that is taken as the sample's duration
+            in seconds (for scenarios that time only part of each sample).
+        repeat: Default number of timed samples
+        description: One-line summary (from the setup docstring)
+    """
+
+    def __init__(self, name, setup, repeat):
+        self.name = name
+        self.setup = setup
+        self.repeat = repeat
+        self.description = (setup.__doc__ or '').strip().split('\n')[0]
+
+
+def scenario(name, repeat=20):
+    """
+    Decorator registering a scenario setup function in SCENARIOS.
+
+    Args:
+        name: Scenario name
+        repeat: Default number of timed samples
+    """
+    def register(setup):
+        SCENARIOS[name] = Scenario(name, setup, repeat)
+        return setup
+    return register
+
+
+def summarize(times, ops):
+    """
+    Summarize sample durations as per-operation statistics.
+
+    Args:
+        times: Sample durations in seconds
+        ops: Operations per sample
+
+    Returns:
+        dict: samples, ops, min/median/mean/stdev/p95 (seconds per op) and
+        ops_per_sec (from the median)
+    """
+    per_op = sorted(t / ops for t in times)
+    median = statistics.median(per_op)
+    return {
+        'samples': len(per_op),
+        'ops': ops,
+        'min': per_op[0],
+        'median': median,
+        'mean': statistics.fmean(per_op),
+        'stdev': statistics.stdev(per_op) if len(per_op) > 1 else 0.0,
+        'p95': per_op[min(len(per_op) - 1, int(round(0.95 * (len(per_op) - 1))))],
+        'ops_per_sec': 1.0 / median if median else float('inf'),
+    }
+
+
+def run(name, repeat=None, warmup=1):
+    """
+    Run one scenario.
+
+    Args:
+        name: Scenario name (key of SCENARIOS)
+        repeat: Timed samples (default: the scenario's own)
+        warmup: Untimed samples run first
+
+    Returns:
+        dict: summarize() of the timed samples
+    """
+    bench = SCENARIOS[name]
+    func, ops = bench.setup()
+
+    for _ in range(warmup):
+        func()
+
+    times = []
+    for _ in range(repeat or bench.repeat):
+        start = time.perf_counter()
+        elapsed = func()
+        times.append(time.perf_counter() - start if elapsed is None else elapsed)
+
+    return summarize(times, ops)
+
+
+def environment():
+    """Describe the machine and commit a run was made on."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'pygame': pg.version.ver,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+
+
+def save_baseline(path, results):
+    """
+    Write results to a baseline file.
+
+    Args:
+        path: JSON file to write
+        results: Scenario name -> summarize() dict
+    """
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
+
+
+def load_baseline(path):
+    """
+    Read a baseline file.
+
+    Returns:
+        dict: {'environment': ..., 'results': {scenario: summary}}
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Compare median times against a baseline.
+
+    Args:
+        results: Scenario name -> summarize() dict
+        baseline: Results dict of a load_baseline() file
+        threshold: Relative change that counts as slower/faster
+
+    Returns:
+        dict: Scenario name -> (ratio new/baseline median, verdict) where
+        verdict is 'slower', 'faster', 'same' or 'new'
+    """
+    comparison = {}
+    for name, summary in results.items():
+        if name not in baseline:
+            comparison[name] = (None, 'new')
+            continue
+        ratio = summary['median'] / baseline[name]['median']
+        if ratio > 1 + threshold:
+            verdict = 'slower'
+        elif ratio < 1 - threshold:
+            verdict = 'faster'
+        else:
+            verdict = 'same'
+        comparison[name] = (ratio, verdict)
+    return comparison
@@ -0,0 +1,252 @@
+"""
+Benchmark scenarios.
+
+Every scenario runs headless (SDL dummy driver) against the Sewer level.
+Views are taken from every cell reachable from the entry position (opening
+doors with reachable switches) facing each direction. The distance field
+scenarios use synthetic levels (see synthetic_level()) up to 1024x1024.
+"""
+import importlib
+import os
+import random
+import time
+
+import numpy as np
+
+from levels.sewer import dungeon
+from src.distance_field import DistanceField
+from src.dungeon import DungeonLevel
+from src.dungeon_tileset import DungeonTileset
+from src.dungeon_view import DungeonView
+from src.env import init_headless
+from src.game import Game
+from src.player import Player, MOVES
+
+from .harness import scenario
+
+
+# Keys pressed by the player_move scenario
+MOVE_KEYS = 10000
+
+# Synthetic level sizes for the distance field scenarios
+FIELD_SIZES = (64, 256, 1024)
+
+# Fraction of blocked cells on synthetic levels
+FIELD_DENSITY = 0.25
+
+# Party steps per distance_field_step sample, monsters per monster_steps batch
+FIELD_STEPS = 20
+FIELD_MONSTERS = 1000
+
+# DistanceField limit for the distance_field_limit_step scenarios
+FIELD_LIMIT = 32
+
+_view = None
+
+
+def reachable_poses(level=None):
+    """
+    Every (x, y, direction) the player can reach on a level.
+
+    Args:
+        level: DungeonLevel (default: the Sewer entry level)
+    """
+    if level is None:
+        level = dungeon.levels[dungeon.entry_pos[0]]
+    _, x, y, _ = dungeon.entry_pos
+    return [
+        (cx, cy, direction)
+        for cx, cy in level.reachable_cells(x, y, use_switches=True)
+        for direction in 'NESW'
+    ]
+
+
+def _shared_view():
+    """One DungeonView shared by the view scenarios (loading images is slow)."""
+    global _view
+    init_headless()
+    if _view is None:
+        _view = DungeonView(dungeon.levels[0].environment)
+    return _view
+
+
+@scenario('tileset_load', repeat=5)
+def tileset_load():
+    """DungeonTileset() construction (CSV parsing, sprite cutting, calibration)."""
+    init_headless()
+
+    def sample():
+        DungeonTileset()
+
+    return sample, 1
+
+
+@scenario('update_panels')
+def update_panels():
+    """DungeonView.update_panels for every reachable Sewer pose."""
+    level = dungeon.levels[0]
+    view = _shared_view()
+    poses = reachable_poses(level)
+
+    def sample():
+        for pose in poses:
+            view.update_panels(pose, level.walls_x, level.walls_y, level.adornments, level.clipping)
+
+    return sample, len(poses)
+
+
+@scenario('redraw_window', repeat=5)
+def redraw_window():
+    """Game.redraw_window for every reachable Sewer pose (full scene render)."""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    level = dungeon.levels[0]
+    player = Player(dungeon)
+    game = Game(player)
+    game.launch()
+    game.clock.render_interval = 0  # No render cap
+    game.dungeon_view_init(_shared_view())
+    poses = reachable_poses(level)
+
+    def sample():
+        # Only the redraw is timed, not the panel update for each pose
+        elapsed = 0.0
+        for pose in poses:
+            player.set_pose(*pose)
+            game.dungeon_view.update_panels(
+                pose, level.walls_x, level.walls_y, level.adornments, level.clipping
+            )
+            game.invalidate()
+            start = time.perf_counter()
+            game.redraw_window()
+            elapsed += time.perf_counter() - start
+        return elapsed
+
+    return sample, len(poses)
+
+
+@scenario('hot_reload', repeat=5)
+def hot_reload():
+    """F5 hot reload: reload tileset/view modules and rebuild the view."""
+    init_headless()
+    level = dungeon.levels[0]
+    player = Player(dungeon)
+    game = Game(player)
+
+    def sample():
+        tileset_module = importlib.import_module('src.dungeon_tileset')
+        view_module = importlib.import_module('src.dungeon_view')
+        importlib.reload(tileset_module)
+        importlib.reload(view_module)
+        view = view_module.DungeonView(level.environment)
+        game.dungeon_view_init(view)
+        view.update_panels(
+            player.level_pos, level.walls_x, level.walls_y, level.adornments, level.clipping
+        )
+
+    return sample, 1
+
+
+@scenario('player_move')
+def player_move():
+    """Player.move throughput over a fixed random key sequence."""
+    level = dungeon.levels[0]
+    player = Player(dungeon)
+    start = player.level_pos
+    keys = random.Random(0).choices(sorted({key for key, _ in MOVES}), k=MOVE_KEYS)
+
+    def sample():
+        player.set_pose(*start)
+        move = player.move
+        clipping = level.clipping
+        for key in keys:
+            move(clipping, key)
+
+    return sample, len(keys)
+
+
+def synthetic_level(size, density=FIELD_DENSITY, seed=0):
+    """
+    A size x size DungeonLevel with randomly blocked cells, for scenarios
+    that need bigger maps than the Sewer. The centre cell is always open.
+    """
+    rng = np.random.default_rng(seed)
+    clipping = (rng.random((size, size)) < density).astype(int)
+    clipping[size // 2, size // 2] = 0
+    return DungeonLevel(dungeon.levels[0].environment, None, None, clipping.tolist(), {}, {})
+
+
+def _party_walk(level, steps):
+    """A walk of up to `steps` moves from the centre of a level, one cell at a time."""
+    x = y = len(level.clipping) // 2
+    walk = [(x, y)]
+    rng = random.Random(0)
+    for _ in range(steps * 10):
+        dx, dy = rng.choice(((0, -1), (1, 0), (0, 1), (-1, 0)))
+        if level.clipping[y + dy][x + dx] == 0 and (x + dx, y + dy) not in walk:
+            x, y = x + dx, y + dy
+            walk.append((x, y))
+            if len(walk) > steps:
+                break
+    return walk
+
+
+def _field_scenarios(size):
+    """Register the distance_field scenarios for one synthetic level size."""
+    def full():
+        level = synthetic_level(size)
+        field = level.distance_field()
+        field.update(size // 2, size // 2)
+
+        def sample():
+            field.recompute()
+
+        return sample, 1
+
+    def step(limit=None):
+        level = synthetic_level(size)
+        field = DistanceField(level, limit)
+        walk = _party_walk(level, FIELD_STEPS)
+
+        def sample():
+            # Start each sample from a full field at the walk's start
+            field.update(*walk[0])
+            field.recompute()
+            elapsed = 0.0
+            for cell in walk[1:]:
+                start = time.perf_counter()
+                field.update(*cell)
+                elapsed += time.perf_counter() - start
+            return elapsed
+
+        return sample, len(walk) - 1
+
+    def limit_step():
+        return step(FIELD_LIMIT)
+
+    full.__doc__ = f"DistanceField full recompute on a {size}x{size} level."
+    step.__doc__ = f"DistanceField incremental update per party step on a {size}x{size} level."
+    limit_step.__doc__ = f"As distance_field_step_{size}, with a limit of FIELD_LIMIT steps."
+    scenario(f'distance_field_{size}', repeat=10)(full)
+    scenario(f'distance_field_step_{size}', repeat=10)(step)
+    scenario(f'distance_field_limit_step_{size}', repeat=10)(limit_step)
+
+
+for _size in FIELD_SIZES:
+    _field_scenarios(_size)
+
+
+@scenario('monster_steps')
+def monster_steps():
+    """DistanceField.steps() for a batch of FIELD_MONSTERS monsters on the largest synthetic level."""
+    size = FIELD_SIZES[-1]
+    level = synthetic_level(size)
+    field = level.distance_field()
+    field.update(size // 2, size // 2)
+    rng = np.random.default_rng(1)
+    xs, ys = rng.integers(0, size, (2, FIELD_MONSTERS))
+
+    def sample():
+        field.steps(xs, ys)
+
+    return sample, 1
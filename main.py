@@ -7,54 +7,168 @@ Controls:
     Q/E  - Rotate left/right
     SPACE - Interact with switches
     F5   - Hot-reload tileset (after sprite_viewer changes)
+    F6/F9 - Quicksave/quickload (quicksave.pobs)
     ESC  - Quit
+
+Options:
+    --record FILE      Record every input to FILE for tools/replay.py
+    --profile-startup  Print the time taken by each startup stage and import,
+                       then quit after the first frame
 """
-import pygame as pg
-import importlib
+import sys
+
+from src.startup import StartupProfiler
+
+# Only the display and the current environment are set up before the first
+# frame; everything else (recording, other environments) is loaded on demand
+profiler = StartupProfiler(time_imports='--profile-startup' in sys.argv)
+
+with profiler.stage('imports'):
+    import pygame as pg
+    import argparse
+    import importlib
+    import logging
+
+    from src import log
+    from src.player import Player
+    from src.game import Game
+    import src.dungeon_tileset
+    import src.dungeon_view
+    from src.dungeon_view import DungeonView
+    from src.save import track, save_game, load_game
+    from levels.sewer import dungeon
+
+
+# Quicksave file (F6 saves, F9 loads)
+QUICKSAVE = 'quicksave.pobs'
 
-from src.player import Player
-from src.game import Game
-import src.dungeon_tileset
-import src.dungeon_view
-from src.dungeon_view import DungeonView
-from levels.sewer import dungeon
 
+def main(record=None, profile_startup=False):
+    """
+    Run the game.
 
-def main():
-    # Initialize player and game
-    player = Player(dungeon)
+    Args:
+        record: If given, record every input to this file
+        profile_startup: Print the startup breakdown and quit after the first frame
+    """
+    profiler.stop()
+    log.configure()
+    render_log = log.get_logger('render')
+    load_log = log.get_logger('load')
+
+    # Initialize player and game; track level changes from the start for quicksaves
+    track(dungeon)
+    player = Player(dungeon, log=log.hook('movement'))
     game = Game(player)
-    game.launch()
+    with profiler.stage('display'):
+        game.launch()
 
-    # Initialize dungeon view
-    dungeon_view = DungeonView(dungeon.levels[0].environment)
-    game.dungeon_view_init(dungeon_view)
+    recorder = None
+    if record:
+        from src.replay import InputRecorder
+        recorder = InputRecorder(record, dungeon, player.dungeon_pos)
 
-    # Initial panel update
-    dungeon_view.update_panels(
-        player.level_pos,
-        dungeon.levels[0].walls_x,
-        dungeon.levels[0].walls_y,
-        dungeon.levels[0].adornments,
-        dungeon.levels[0].clipping
-    )
+    # Initialize dungeon view (loads the current environment's tiles only)
+    with profiler.stage('tileset ' + dungeon.levels[0].environment):
+        dungeon_view = DungeonView(dungeon.levels[0].environment)
+        game.dungeon_view_init(dungeon_view)
 
-    # Main game loop
-    while True:
-        game.tick()
+    with profiler.stage('first frame'):
+        # Initial panel update
+        dungeon_view.update_panels(
+            player.level_pos,
+            dungeon.levels[0].walls_x,
+            dungeon.levels[0].walls_y,
+            dungeon.levels[0].adornments,
+            dungeon.levels[0].clipping
+        )
         game.redraw_window()
 
-        for event in pg.event.get():
-            if event.type == pg.QUIT:
-                game.quit()
+    if profile_startup:
+        print(profiler.report())
+        game.quit()
+
+    # Main game loop
+    try:
+        while True:
+            game.tick()
 
-            if event.type == pg.KEYDOWN:
-                if event.key == pg.K_ESCAPE:
+            for event in pg.event.get():
+                if event.type == pg.QUIT:
                     game.quit()
 
-                if pg.key.name(event.key) in 'qweasd':
-                    moved = player.move(dungeon.levels[0].clipping, pg.key.name(event.key))
-                    if moved:
+                if event.type in (pg.VIDEOEXPOSE, pg.WINDOWEXPOSED):
+                    game.invalidate()
+
+                if event.type == pg.KEYDOWN:
+                    if event.key == pg.K_ESCAPE:
+                        game.quit()
+
+                    if recorder is not None:
+                        recorder.record(game.clock.ticks, pg.key.name(event.key))
+
+                    if pg.key.name(event.key) in 'qweasd':
+                        moved = player.move(dungeon.levels[0].clipping, pg.key.name(event.key))
+                        if moved:
+                            dungeon_view.update_panels(
+                                player.level_pos,
+                                dungeon.levels[0].walls_x,
+                                dungeon.levels[0].walls_y,
+                                dungeon.levels[0].adornments,
+                                dungeon.levels[0].clipping
+                            )
+                            game.invalidate()
+                            if render_log.isEnabledFor(logging.DEBUG):
+                                render_log.debug("FPS: %d", game.clock.get_fps())
+
+                    if event.key == pg.K_SPACE:
+                        door = player.click_switch(
+                            dungeon.levels[0].switches,
+                            dungeon.levels[0].adornments,
+                            dungeon.levels[0].clipping
+                        )
+                        if door is not None:
+                            dungeon.levels[0].door_changed(*door)
+                        # Refresh view to show lever state change (no background swap)
+                        dungeon_view.update_panels(
+                            player.level_pos,
+                            dungeon.levels[0].walls_x,
+                            dungeon.levels[0].walls_y,
+                            dungeon.levels[0].adornments,
+                            dungeon.levels[0].clipping,
+                            swap_background=False
+                        )
+                        game.invalidate()
+
+                    if event.key == pg.K_F6:
+                        save_game(QUICKSAVE, dungeon, player)
+                        load_log.info("Saved to %s", QUICKSAVE)
+
+                    if event.key == pg.K_F9:
+                        try:
+                            load_game(QUICKSAVE, dungeon, player)
+                        except (OSError, ValueError) as error:
+                            load_log.warning("Couldn't load %s: %s", QUICKSAVE, error)
+                        else:
+                            if recorder is not None:
+                                recorder.loaded(dungeon, player.dungeon_pos)
+                            dungeon_view.update_panels(
+                                player.level_pos,
+                                dungeon.levels[0].walls_x,
+                                dungeon.levels[0].walls_y,
+                                dungeon.levels[0].adornments,
+                                dungeon.levels[0].clipping
+                            )
+                            game.invalidate()
+                            load_log.info("Loaded %s", QUICKSAVE)
+
+                    if event.key == pg.K_F5:
+                        # Hot-reload tileset and view after sprite_viewer changes
+                        load_log.info("Reloading tileset and view...")
+                        importlib.reload(src.dungeon_tileset)
+                        importlib.reload(src.dungeon_view)
+                        dungeon_view = src.dungeon_view.DungeonView(dungeon.levels[0].environment)
+                        game.dungeon_view_init(dungeon_view)
                         dungeon_view.update_panels(
                             player.level_pos,
                             dungeon.levels[0].walls_x,
@@ -62,40 +176,18 @@ def main():
                             dungeon.levels[0].adornments,
                             dungeon.levels[0].clipping
                         )
-                        print(f"FPS: {int(game.clock.get_fps())}")
-
-                if event.key == pg.K_SPACE:
-                    player.click_switch(
-                        dungeon.levels[0].switches,
-                        dungeon.levels[0].adornments,
-                        dungeon.levels[0].clipping
-                    )
-                    # Refresh view to show lever state change (no background swap)
-                    dungeon_view.update_panels(
-                        player.level_pos,
-                        dungeon.levels[0].walls_x,
-                        dungeon.levels[0].walls_y,
-                        dungeon.levels[0].adornments,
-                        dungeon.levels[0].clipping,
-                        swap_background=False
-                    )
-
-                if event.key == pg.K_F5:
-                    # Hot-reload tileset and view after sprite_viewer changes
-                    print("Reloading tileset and view...")
-                    importlib.reload(src.dungeon_tileset)
-                    importlib.reload(src.dungeon_view)
-                    dungeon_view = src.dungeon_view.DungeonView(dungeon.levels[0].environment)
-                    game.dungeon_view_init(dungeon_view)
-                    dungeon_view.update_panels(
-                        player.level_pos,
-                        dungeon.levels[0].walls_x,
-                        dungeon.levels[0].walls_y,
-                        dungeon.levels[0].adornments,
-                        dungeon.levels[0].clipping
-                    )
-                    print("Reload complete!")
+                        load_log.info("Reload complete!")
+
+            game.redraw_window()
+    finally:
+        if recorder is not None:
+            recorder.close()
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Py of the Beholder')
+    parser.add_argument('--record', metavar='FILE', help='record every input to FILE')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='print startup timings and quit after the first frame')
+    args = parser.parse_args()
+    main(record=args.record, profile_startup=args.profile_startup)
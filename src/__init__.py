@@ -1,7 +1,25 @@
 # POB Source Package
-from .game import Game
-from .player import Player
-from .dungeon import Dungeon, DungeonLevel
-from .dungeon_view import DungeonView
-from .dungeon_tileset import DungeonTileset
-from .utils import SCALE_FACTOR
+#
+# Classes are imported on first access so that importing one module
+# (e.g. src.player) doesn't pull in pygame, pandas and numpy.
+_EXPORTS = {
+    'Game': '.game',
+    'Player': '.player',
+    'Dungeon': '.dungeon',
+    'DungeonLevel': '.dungeon',
+    'DungeonView': '.dungeon_view',
+    'DungeonTileset': '.dungeon_tileset',
+    'SCALE_FACTOR': '.utils',
+    'BatchEnv': '.batch_env',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
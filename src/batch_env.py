@@ -0,0 +1,199 @@
+"""
+Batched environment for bots and automated playtests.
+
+Holds the poses of N agents in NumPy arrays and steps them all at once
+against a DungeonLevel's clipping grid, with no per-agent Player objects.
+Observations are the same panel states DungeonView.update_panels() computes
+(wall tile and adornment per panel), encoded as integer codes.
+"""
+import numpy as np
+
+from .dungeon_view import PANELS, PANEL_OFFSETS, HORIZONTAL_FACING, WallType
+from .player import MOVES, BLOCKING
+
+
+# Agent actions, indexed by action number (same keys as Player.move)
+ACTIONS = ('w', 's', 'a', 'd', 'q', 'e')
+
+# Facing directions, indexed by direction number
+DIRECTIONS = ('N', 'E', 'S', 'W')
+
+# Transition tables indexed [action, direction]
+MOVE_DX = np.array([[MOVES[k, d][0] for d in DIRECTIONS] for k in ACTIONS], dtype=np.int32)
+MOVE_DY = np.array([[MOVES[k, d][1] for d in DIRECTIONS] for k in ACTIONS], dtype=np.int32)
+MOVE_DIR = np.array(
+    [[DIRECTIONS.index(MOVES[k, d][2]) for d in DIRECTIONS] for k in ACTIONS], dtype=np.int32
+)
+
+# Panels observed by agents (the background only alternates BG1/BG2)
+VIEW_PANELS = tuple(p for p in PANELS if p != 'BG')
+
+# Panel offsets indexed [panel, direction] -> (dx, dy)
+PANEL_DX = np.array([[PANEL_OFFSETS[p][d][0] for d in DIRECTIONS] for p in VIEW_PANELS], dtype=np.int32)
+PANEL_DY = np.array([[PANEL_OFFSETS[p][d][1] for d in DIRECTIONS] for p in VIEW_PANELS], dtype=np.int32)
+
+# Panel type per view panel ('F', 'P' or 'D')
+_PANEL_TYPES = np.array([p[1] for p in VIEW_PANELS])
+_IS_DOOR = _PANEL_TYPES == 'D'
+_IS_FRONT = _PANEL_TYPES == 'F'
+
+# Direction numbers where perpendicular walls use walls_x
+_HORIZONTAL = np.array([d in HORIZONTAL_FACING for d in DIRECTIONS])
+
+
+class BatchEnv(object):
+    """
+    N agents stepping through one DungeonLevel in lock-step.
+
+    Attributes:
+        level: The DungeonLevel agents move in
+        x, y: Agent cell coordinates (int32 arrays of length N)
+        d: Agent facing direction numbers, indexes into DIRECTIONS (int32 array)
+        vocab (list): Observation code -> tile/adornment string
+    """
+
+    def __init__(self, level, n, start):
+        """
+        Args:
+            level: DungeonLevel to move in
+            n: Number of agents
+            start: Starting (x, y, direction) shared by every agent
+        """
+        self.level = level
+        self.n = n
+        self.x = np.zeros(n, dtype=np.int32)
+        self.y = np.zeros(n, dtype=np.int32)
+        self.d = np.zeros(n, dtype=np.int32)
+
+        self.vocab = [WallType.NONE, WallType.NO_ADORNMENT]
+        self._codes = {value: code for code, value in enumerate(self.vocab)}
+        self.sync()
+        self.reset(start)
+
+    def _encode(self, value):
+        if value not in self._codes:
+            self._codes[value] = len(self.vocab)
+            self.vocab.append(value)
+        return self._codes[value]
+
+    def _encode_grid(self, grid):
+        return np.array([[self._encode(v) for v in row] for row in grid], dtype=np.int16)
+
+    def sync(self):
+        """
+        Re-read the level's grids. Call after doors or adornments change
+        (e.g. Player.click_switch) to keep agents in step with the level.
+        """
+        level = self.level
+        self.clipping = np.array(level.clipping, dtype=np.int8)
+        self._walls_x = self._encode_grid(level.walls_x)
+        self._walls_y = self._encode_grid(level.walls_y)
+        self._doors = self._encode_grid([[str(v) for v in row] for row in level.clipping])
+
+        # Dense adornment grids, one per wall axis
+        self._adorn = {}
+        for axis, walls in (('x', self._walls_x), ('y', self._walls_y)):
+            grid = np.full(walls.shape, self._codes[WallType.NO_ADORNMENT], dtype=np.int16)
+            for (a, ax, ay), name in level.adornments.items():
+                if a == axis and 0 <= ay < grid.shape[0] and 0 <= ax < grid.shape[1]:
+                    grid[ay, ax] = self._encode(name)
+            self._adorn[axis] = grid
+
+    def reset(self, start):
+        """
+        Put every agent at a pose.
+
+        Args:
+            start: (x, y, direction) for all agents, or (xs, ys, directions)
+                arrays with one pose per agent
+
+        Returns:
+            The initial observations (see observe())
+        """
+        x, y, d = start
+        self.x[:] = x
+        self.y[:] = y
+        self.d[:] = [DIRECTIONS.index(v) for v in np.broadcast_to(d, (self.n,))]
+        return self.observe()
+
+    def step(self, actions):
+        """
+        Apply one action per agent. Blocked moves leave the agent in place.
+
+        Args:
+            actions: Action numbers (indexes into ACTIONS), one per agent
+
+        Returns:
+            tuple: (observations, moved) where moved is a bool array marking
+            the agents whose action succeeded
+        """
+        actions = np.asarray(actions)
+        nx = self.x + MOVE_DX[actions, self.d]
+        ny = self.y + MOVE_DY[actions, self.d]
+        nd = MOVE_DIR[actions, self.d]
+
+        height, width = self.clipping.shape
+        inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+        cells = self.clipping[np.clip(ny, 0, height - 1), np.clip(nx, 0, width - 1)]
+        moved = inside & ~np.isin(cells, BLOCKING)
+
+        self.x = np.where(moved, nx, self.x).astype(np.int32)
+        self.y = np.where(moved, ny, self.y).astype(np.int32)
+        self.d = np.where(moved, nd, self.d).astype(np.int32)
+        return self.observe(), moved
+
+    def _lookup(self, grid, px, py, default):
+        height, width = grid.shape
+        inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        values = grid[np.clip(py, 0, height - 1), np.clip(px, 0, width - 1)]
+        return np.where(inside, values, default)
+
+    def observe(self):
+        """
+        Compute every agent's panel states.
+
+        Returns:
+            np.ndarray: int16 array of shape (N, len(VIEW_PANELS), 2) holding
+            the tile code and adornment code of each panel (see vocab)
+        """
+        # Cell shown by each panel for each agent: shape (N, panels)
+        px = self.x[:, None] + PANEL_DX[:, self.d].T
+        py = self.y[:, None] + PANEL_DY[:, self.d].T
+
+        none = self._codes[WallType.NONE]
+        no_adornment = self._codes[WallType.NO_ADORNMENT]
+
+        # F panels use walls_x when facing N/S, P panels when facing E/W
+        uses_walls_x = _IS_FRONT[None, :] != _HORIZONTAL[self.d][:, None]
+
+        tiles = np.where(
+            uses_walls_x,
+            self._lookup(self._walls_x, px, py, none),
+            self._lookup(self._walls_y, px, py, none)
+        )
+        adornments = np.where(
+            uses_walls_x,
+            self._lookup(self._adorn['x'], px, py, no_adornment),
+            self._lookup(self._adorn['y'], px, py, no_adornment)
+        )
+
+        # Door panels show the clipping value and never carry adornments
+        doors = self._lookup(self._doors, px, py, self._encode('0'))
+        tiles = np.where(_IS_DOOR[None, :], doors, tiles)
+        adornments = np.where(_IS_DOOR[None, :], no_adornment, adornments)
+
+        return np.stack([tiles, adornments], axis=-1).astype(np.int16)
+
+    def decode(self, observation):
+        """
+        Turn one agent's observation back into DungeonView-style dicts.
+
+        Args:
+            observation: One row of observe(), shape (len(VIEW_PANELS), 2)
+
+        Returns:
+            tuple: ({panel: tile}, {panel: adornment})
+        """
+        tiles = {p: self.vocab[c] for p, c in zip(VIEW_PANELS, observation[:, 0])}
+        adornments = {p: self.vocab[c] for p, c in zip(VIEW_PANELS, observation[:, 1])}
+        return tiles, adornments
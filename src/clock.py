@@ -0,0 +1,95 @@
+import time
+from collections import deque
+
+
+class GameClock(object):
+    """
+    Fixed-timestep simulation clock with an independently capped render rate.
+
+    Real elapsed time is added to an accumulator and consumed in fixed
+    simulation steps, so game logic advances at the same rate however fast
+    (or slowly) frames are drawn. Time left over after a render stall stays in
+    the accumulator and is caught up on the following calls rather than lost.
+
+    Attributes:
+        timestep (float): Length of one simulation step in seconds
+        render_interval (float): Minimum seconds between renders (0 = uncapped)
+        max_steps (int): Most simulation steps run per call to steps()
+        accumulator (float): Real time not yet consumed by simulation steps
+        ticks (int): Number of simulation steps run so far
+    """
+
+    def __init__(self, sim_rate=60, render_fps=60, max_steps=None):
+        """
+        Args:
+            sim_rate: Simulation steps per second
+            render_fps: Render cap in frames per second (None or 0 for no cap)
+            max_steps: Most steps to run per call; defaults to one second's worth
+        """
+        self.timestep = 1.0 / sim_rate
+        self.render_interval = 1.0 / render_fps if render_fps else 0.0
+        self.max_steps = max_steps if max_steps is not None else sim_rate
+        self.accumulator = 0.0
+        self.ticks = 0
+
+        self._last_time = time.perf_counter()
+        self._next_render = self._last_time
+        self._render_times = deque(maxlen=30)
+
+    @property
+    def sim_time(self):
+        """Simulated time in seconds."""
+        return self.ticks * self.timestep
+
+    @property
+    def interpolation(self):
+        """Fraction (0-1) of the next step already elapsed, for render interpolation."""
+        return min(self.accumulator / self.timestep, 1.0)
+
+    def steps(self):
+        """
+        Add the real time elapsed since the last call and yield one timestep
+        for every simulation step that is due.
+
+        Yields:
+            float: The fixed timestep in seconds
+        """
+        now = time.perf_counter()
+        self.accumulator += now - self._last_time
+        self._last_time = now
+
+        count = min(int(self.accumulator // self.timestep), self.max_steps)
+        self.accumulator -= count * self.timestep
+
+        for _ in range(count):
+            self.ticks += 1
+            yield self.timestep
+
+    def render_due(self):
+        """Return True if the render cap allows drawing a frame now."""
+        return time.perf_counter() >= self._next_render
+
+    def rendered(self):
+        """Record that a frame was drawn, starting the next render interval."""
+        now = time.perf_counter()
+        self._render_times.append(now)
+
+        # Keep a steady cadence, but don't let a stall bank up extra frames
+        self._next_render += self.render_interval
+        if self._next_render < now:
+            self._next_render = now + self.render_interval
+
+    def wait(self):
+        """Sleep until the next simulation step is due."""
+        remaining = self.timestep - self.accumulator - (time.perf_counter() - self._last_time)
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def get_fps(self):
+        """Return the measured render rate over the last few frames."""
+        if len(self._render_times) < 2:
+            return 0.0
+        elapsed = self._render_times[-1] - self._render_times[0]
+        if elapsed <= 0:
+            return 0.0
+        return (len(self._render_times) - 1) / elapsed
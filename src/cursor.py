@@ -0,0 +1,107 @@
+import pygame as pg
+
+from .utils import COLORKEY
+
+
+# Cursor sprite location within the 2x scaled item icon sheet
+CURSOR_SCALE = 2
+CURSOR_AREA = (0, 0, 22, 32)
+
+
+class Cursor(object):
+    """
+    Mouse cursor drawn from the item icon sheet.
+
+    When the video driver supports colour cursors the OS draws the cursor
+    (pg.mouse.set_cursor), so mouse motion never touches the window. Otherwise
+    a software cursor is used that only repaints its old and new rects from
+    the cached frame instead of redrawing the whole window.
+
+    Attributes:
+        image: The cursor surface
+        hardware (bool): True if the OS is drawing the cursor
+        rect: Screen rect the software cursor was last drawn at (None if not drawn)
+    """
+
+    def __init__(self, hotspot=(0, 0), hardware=True):
+        """
+        Build the cursor and install it. Requires the display mode to be set.
+
+        Args:
+            hotspot: Click point within the cursor image
+            hardware: Try the OS colour cursor before falling back to software
+        """
+        self.image = self._load_image()
+        self.hardware = hardware and self._set_hardware_cursor(hotspot)
+        self.rect = None
+
+        # The software cursor replaces the OS one
+        pg.mouse.set_visible(self.hardware)
+
+    def _load_image(self):
+        sheet = pg.image.load('assets/Environments/itemicn.png')
+        sheet = pg.transform.scale(
+            sheet,
+            (sheet.get_width() * CURSOR_SCALE, sheet.get_height() * CURSOR_SCALE)
+        )
+        sheet.set_colorkey(COLORKEY, pg.RLEACCEL)
+        sheet = sheet.convert()
+
+        return sheet.subsurface(CURSOR_AREA).copy()
+
+    def _set_hardware_cursor(self, hotspot):
+        """
+        Install the cursor image as an OS colour cursor.
+
+        Returns:
+            bool: True if the video driver accepted the cursor
+        """
+        # Colour cursors need per-pixel alpha rather than a colorkey
+        surface = pg.Surface(self.image.get_size(), pg.SRCALPHA)
+        surface.fill((0, 0, 0, 0))
+        surface.blit(self.image, (0, 0))
+
+        try:
+            pg.mouse.set_cursor(pg.cursors.Cursor(hotspot, surface))
+        except (pg.error, AttributeError, TypeError):
+            return False
+        return True
+
+    def draw(self, window):
+        """
+        Draw the software cursor at the mouse position after a full redraw.
+
+        Args:
+            window: Surface to draw on
+        """
+        if self.hardware:
+            return
+        self.rect = self.image.get_rect(topleft=pg.mouse.get_pos())
+        window.blit(self.image, self.rect)
+
+    def refresh(self, window, frame):
+        """
+        Move the software cursor without redrawing the frame.
+
+        The old cursor rect is restored from the cached frame and the cursor
+        is drawn at the new mouse position.
+
+        Args:
+            window: Surface the cursor is drawn on
+            frame: Cached copy of the window contents without the cursor
+
+        Returns:
+            list: Rects that changed and need a display update (empty if none)
+        """
+        if self.hardware:
+            return []
+        if self.rect is not None and self.rect.topleft == pg.mouse.get_pos():
+            return []
+
+        dirty = []
+        if self.rect is not None:
+            window.blit(frame, self.rect, self.rect)
+            dirty.append(self.rect)
+        self.draw(window)
+        dirty.append(self.rect)
+        return dirty
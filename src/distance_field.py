@@ -0,0 +1,257 @@
+"""
+Breadth-first distance field from the party over a level's clipping grid.
+
+One field answers "which way to the party?" for every monster on the level:
+each monster steps to the neighbouring cell with the smallest distance
+(step() for one, steps() for a batch) instead of running its own path
+search.
+
+The field is a NumPy array kept up to date incrementally:
+
+- Party moves to a neighbouring cell: every distance changes by at most one,
+  so the old field plus one is an upper bound everywhere. Seed the new cell
+  with 0 and relax distances downwards from it. The array holds distances
+  relative to a running offset, so "plus one everywhere" is adding one to
+  the offset and a step costs only the cells that get closer.
+- Door opens: distances can only shrink; relax downwards from the door.
+- Door closes: distances can grow, recompute the field.
+- Anything else (teleport, first use): recompute.
+
+The work per update is bounded by the level's diameter: each relaxation
+runs one NumPy wave per step of distance. For big levels, give the field a
+`limit`: only distances up to it are kept exact (anything farther reads as
+UNREACHABLE, i.e. out of range), so updates touch O(limit^2) cells in at
+most `limit` waves whatever the level size.
+
+Example:
+    field = level.distance_field()
+    field.update(player.x, player.y)        # after every party move
+    x, y = field.step(monster_x, monster_y)
+"""
+import numpy as np
+
+from .pathfinding import PathGrid
+from .player import BLOCKING
+
+
+# Distance of cells the party can't be reached from
+UNREACHABLE = np.iinfo(np.int32).max
+
+# Offset at which stored distances are rebased (keeps them well inside int32)
+_REBASE = 1 << 30
+
+
+class DistanceField(object):
+    """
+    Distances (in steps, 4-connected) from every cell to the party.
+
+    The grid is stored with a one-cell blocked border so that neighbours are
+    always flat index +-1 and +-stride, never out of range.
+
+    Attributes:
+        level: The DungeonLevel
+        source: (x, y) of the party, None until the first update()
+        width, height: Level size in cells
+        limit: Largest distance kept, None for no limit
+    """
+
+    def __init__(self, level, limit=None):
+        """
+        Args:
+            level: DungeonLevel (the field registers for its door changes)
+            limit: Largest distance to keep; farther cells read as UNREACHABLE
+                (default: the whole level)
+        """
+        self.level = level
+        self.source = None
+        self.limit = limit
+        walkable = PathGrid(level.clipping).to_array()
+        self.height, self.width = walkable.shape
+        self.stride = self.width + 2
+
+        padded = np.zeros((self.height + 2, self.stride), dtype=bool)
+        padded[1:-1, 1:-1] = walkable
+        self._walkable = padded.ravel()
+        # Stored distances: true distance - self._base (UNREACHABLE stays as is)
+        self._dist = np.full(self._walkable.size, UNREACHABLE, dtype=np.int32)
+        self._base = 0
+        self._offsets = np.array([-self.stride, 1, self.stride, -1])
+        self._slot = np.zeros(self._walkable.size, dtype=np.intp)    # Scratch for _relax()
+
+        level.add_door_listener(self.door_changed)
+
+    def _cap(self):
+        """Largest stored distance that is kept exact (see limit)."""
+        return UNREACHABLE - 1 if self.limit is None else self.limit - self._base
+
+    def _true(self, stored):
+        return np.where((stored == UNREACHABLE) | (stored > self._cap()), UNREACHABLE, stored + self._base)
+
+    @property
+    def distances(self):
+        """
+        (height, width) int32 array of distances, UNREACHABLE where cut off.
+        Builds a new array (O(cells)); use distances_at() for a few cells.
+        """
+        return self._true(self._dist.reshape(self.height + 2, self.stride)[1:-1, 1:-1])
+
+    def distance(self, x, y):
+        """Steps from (x, y) to the party (UNREACHABLE if there's no way)."""
+        stored = int(self._dist[self._index(x, y)])
+        return UNREACHABLE if stored > self._cap() else stored + self._base
+
+    def distances_at(self, xs, ys):
+        """
+        Distances of many cells at once.
+
+        Args:
+            xs, ys: Integer arrays of cells
+
+        Returns:
+            numpy.ndarray: int32 distance per cell (UNREACHABLE where cut off)
+        """
+        return self._true(self._dist[(np.asarray(ys) + 1) * self.stride + np.asarray(xs) + 1])
+
+    def _index(self, x, y):
+        return (y + 1) * self.stride + x + 1
+
+    def _relax(self, frontier):
+        """
+        Lower distances outwards from the frontier cells until nothing changes.
+
+        The frontier is always a single seed cell to begin with, so every
+        cell lowered in one wave gets the same distance (seed + wave) and
+        each wave is a plain assignment. From a seed in an otherwise
+        UNREACHABLE field this is a level-by-level breadth-first search.
+        Stops at the limit; cells beyond it keep upper bounds.
+        """
+        dist, walkable, offsets, slot = self._dist, self._walkable, self._offsets, self._slot
+        distance, cap = dist[frontier[0]], self._cap()
+        while frontier.size and distance < cap:
+            distance += 1
+            neighbours = (frontier[:, None] + offsets).ravel()
+            neighbours = neighbours[walkable[neighbours] & (dist[neighbours] > distance)]
+            dist[neighbours] = distance
+
+            # Drop duplicates (cells next to two frontier cells)
+            order = np.arange(neighbours.size)
+            slot[neighbours] = order
+            frontier = neighbours[slot[neighbours] == order]
+
+    def recompute(self):
+        """Rebuild the whole field from the current source."""
+        self._dist.fill(UNREACHABLE)
+        self._base = 0
+        if self.source is None:
+            return
+        index = self._index(*self.source)
+        if self._walkable[index]:
+            self._dist[index] = 0
+            self._relax(np.array([index]))
+
+    def update(self, x, y):
+        """
+        Move the field's source to the party's cell.
+
+        A step to a neighbouring cell is applied incrementally; any other
+        change of source recomputes the field.
+
+        Args:
+            x, y: Party cell
+        """
+        if self.source == (x, y):
+            return
+
+        previous, self.source = self.source, (x, y)
+        index = self._index(x, y)
+        if previous is None or abs(x - previous[0]) + abs(y - previous[1]) != 1 \
+                or not self._walkable[index] or self._dist[index] == UNREACHABLE:
+            self.recompute()
+            return
+
+        # Every distance + 1 (an upper bound), then down from the new cell
+        self._base += 1
+        if self._base >= _REBASE:
+            np.add(self._dist, self._base, out=self._dist, where=self._dist != UNREACHABLE)
+            self._base = 0
+        self._dist[index] = -self._base
+        self._relax(np.array([index]))
+
+    def door_changed(self, x, y):
+        """
+        Update the field after the door at (x, y) opened or closed.
+
+        Args:
+            x, y: Door cell (clipping[y][x])
+        """
+        index = self._index(x, y)
+        walkable = self.level.clipping[y][x] not in BLOCKING
+        if walkable == self._walkable[index]:
+            return
+
+        self._walkable[index] = walkable
+        if not walkable:
+            # Closing only matters if paths went through the door
+            if self._dist[index] != UNREACHABLE:
+                self.recompute()
+            return
+
+        # The party's own cell reopening: the field starts from it again
+        if (x, y) == self.source:
+            self._dist[index] = -self._base
+            self._relax(np.array([index]))
+            return
+
+        nearest = self._dist[index + self._offsets].min()
+        if nearest != UNREACHABLE:
+            self._dist[index] = nearest + 1
+            self._relax(np.array([index]))
+
+    def step(self, x, y):
+        """
+        Next cell towards the party from (x, y).
+
+        Returns:
+            tuple: (x, y) of the neighbour closest to the party, or (x, y)
+            itself if already there or the party can't be reached (or is out
+            of range)
+        """
+        index = self._index(x, y)
+        neighbours = index + self._offsets
+        best = int(np.argmin(self._dist[neighbours]))
+        if self._dist[neighbours[best]] >= self._dist[index] or self._dist[index] > self._cap():
+            return x, y
+        dx, dy = ((0, -1), (1, 0), (0, 1), (-1, 0))[best]
+        return x + dx, y + dy
+
+    def steps(self, xs, ys, occupancy=None):
+        """
+        Next cells towards the party for many monsters at once.
+
+        Args:
+            xs, ys: Integer arrays of monster cells
+            occupancy: OccupancyGrid to respect (DungeonLevel.occupancy):
+                monsters don't step into occupied cells or onto the party,
+                and only the first of several monsters heading for the same
+                cell moves
+
+        Returns:
+            tuple: (xs, ys) arrays of next cells (unchanged where the monster
+            is at the party, can't reach it, is out of range or is blocked)
+        """
+        xs, ys = np.asarray(xs), np.asarray(ys)
+        index = (ys + 1) * self.stride + xs + 1
+        around = self._dist[index[:, None] + self._offsets]
+        best = np.argmin(around, axis=1)
+        moves = (around[np.arange(len(index)), best] < self._dist[index]) & (self._dist[index] <= self._cap())
+
+        dx = np.array([0, 1, 0, -1])[best]
+        dy = np.array([-1, 0, 1, 0])[best]
+        if occupancy is not None:
+            target = index + self._offsets[best]
+            moves &= occupancy.passable_many(xs + dx, ys + dy) & (self._dist[target] != -self._base)
+            target = np.where(moves, target, -1)
+            _, first = np.unique(target, return_index=True)
+            moves &= np.isin(np.arange(len(index)), first)
+
+        return xs + dx * moves, ys + dy * moves
@@ -1,3 +1,8 @@
+from collections import deque
+
+from .player import BLOCKING
+
+
 class Dungeon(object):
     def __init__(self, levels, entry_pos):
         self.levels = levels        # The levels of the dungeon in a list
@@ -12,3 +17,135 @@ class DungeonLevel(object):
         self.clipping = clipping
         self.adornments = adornments
         self.switches = switches
+        self.door_listeners = []    # Called with (x, y) when a door opens or closes
+        self._distance_field = None
+        self.triggers = None        # TriggerIndex, see trigger_index()
+        self.items = None           # ItemIndex, see item_index()
+        self.occupancy = None       # OccupancyGrid, see occupancy_grid()
+        self.changes = None         # LevelChanges, see change_tracker()
+
+    def add_door_listener(self, listener):
+        """
+        Register a callable to be told about door changes (see door_changed).
+
+        Args:
+            listener: Called with (x, y) of the door cell
+        """
+        self.door_listeners.append(listener)
+
+    def door_changed(self, x, y):
+        """
+        Tell the door listeners that clipping[y][x] opened or closed.
+
+        Call after Player.click_switch with the cell it returns.
+        """
+        for listener in self.door_listeners:
+            listener(x, y)
+
+    def distance_field(self, limit=None):
+        """
+        The level's distance field to the party, created on first use.
+
+        Monsters chasing the party share it; call its update(x, y) after the
+        party moves (see src/distance_field.py).
+
+        Args:
+            limit: Largest distance the field keeps, if it's created now
+                (None: the whole level)
+        """
+        if self._distance_field is None:
+            from .distance_field import DistanceField
+            self._distance_field = DistanceField(self, limit)
+        return self._distance_field
+
+    def trigger_index(self):
+        """
+        The level's TriggerIndex (enter/leave/facing triggers checked on every
+        Player.move), created on first use (see src/triggers.py).
+        """
+        if self.triggers is None:
+            from .triggers import TriggerIndex
+            self.triggers = TriggerIndex(self)
+        return self.triggers
+
+    def item_index(self):
+        """
+        The level's ItemIndex (floor items by cell and subcell), created on
+        first use (see src/item_index.py).
+        """
+        if self.items is None:
+            from .item_index import ItemIndex
+            self.items = ItemIndex(self)
+        return self.items
+
+    def occupancy_grid(self):
+        """
+        The level's OccupancyGrid (clipping plus solid entities, used by
+        Player.move and monster AI), created on first use (see
+        src/occupancy.py). An EntityStore creates one for each of its levels.
+        """
+        if self.occupancy is None:
+            from .occupancy import OccupancyGrid
+            self.occupancy = OccupancyGrid(self)
+        return self.occupancy
+
+    def change_tracker(self):
+        """
+        The level's LevelChanges (what changed since loading, for save
+        games), created on first use (see src/save.py). It takes the level as
+        it is then as the base, so create it before anything changes, e.g.
+        with save.track(dungeon) right after loading.
+        """
+        if self.changes is None:
+            from .save import LevelChanges
+            self.changes = LevelChanges(self)
+        return self.changes
+
+    def reachable_cells(self, x, y, use_switches=False):
+        """
+        Find every cell the player can walk to from (x, y).
+
+        Args:
+            x, y: Starting cell
+            use_switches: Also count cells behind doors the player can open
+                with a reachable switch. The level itself is not changed.
+
+        Returns:
+            list: (x, y) cells in breadth-first order, starting with (x, y)
+        """
+        clipping = [list(row) for row in self.clipping] if use_switches else self.clipping
+
+        while True:
+            cells = _flood(clipping, x, y)
+            if not use_switches:
+                return cells
+
+            # Open every closed door with a reachable switch, then flood again
+            opened = False
+            reached = set(cells)
+            for (_, sx, sy, _), ((door_y, door_x), _) in self.switches.items():
+                if (sx, sy) in reached and clipping[door_y][door_x] == 3:
+                    clipping[door_y][door_x] = 2
+                    opened = True
+            if not opened:
+                return cells
+
+
+def _flood(clipping, x, y):
+    """Breadth-first flood fill of the walkable cells connected to (x, y)."""
+    seen = {(x, y)}
+    order = [(x, y)]
+    queue = deque(order)
+
+    while queue:
+        cx, cy = queue.popleft()
+        for nx, ny in ((cx, cy - 1), (cx + 1, cy), (cx, cy + 1), (cx - 1, cy)):
+            if (nx, ny) in seen or not (0 <= ny < len(clipping) and 0 <= nx < len(clipping[ny])):
+                continue
+            if clipping[ny][nx] in BLOCKING:
+                continue
+            seen.add((nx, ny))
+            order.append((nx, ny))
+            queue.append((nx, ny))
+
+    return order
@@ -1,25 +1,57 @@
+from collections import OrderedDict
+
 import pandas as pd
-from .utils import import_image, sub_image, SCALE_FACTOR
+import pygame as pg
+from .log import get_logger
+from .utils import (
+    import_image, sub_image, prepare_surface, calibrate_surface_mode, build_palette,
+    surface_bytes, SCALE_FACTOR, PALETTE_MODE, COLORKEY
+)
+
+
+# Screen area covered by the dungeon viewport (176x120 at 1x scale)
+VIEWPORT_RECT = pg.Rect(0, 0, 176 * SCALE_FACTOR, 120 * SCALE_FACTOR)
 
 
 class DungeonTileset(object):
     """
     Manages dungeon wall tiles and backgrounds.
 
+    Tiles are cut from the wallset sheets one environment at a time: the
+    environments passed to the constructor up front, any other the first
+    time image() asks for it.
+
     Attributes:
-        wallset_images: DataFrame containing the wallset images
-        wall_tiles: DataFrame containing the wall tiles
+        wallset_images: DataFrame containing the wallset images (None until
+            an environment using the sheet is loaded)
+        wall_tiles: DataFrame containing the wall tiles (Image is None for
+            environments that aren't loaded yet)
+        panel_positions: Panel screen positions (x, y), scaled
+        surface_mode: Storage mode of the tile images (see utils.SURFACE_MODES).
+            utils.PALETTE_MODE stores 8-bit tiles sharing one palette per
+            environment, so apply_palette() can recolour them all at once.
+        palettes (dict): Environment -> base palette (PALETTE_MODE only)
+        loaded (set): Environments whose tiles have been cut
+        memory_budget: Bytes of cut tile images to keep, or None for no limit.
+            Over budget, the least recently used tiles are dropped (their
+            Image set to None) and cut again the next time image() asks.
     """
 
-    def __init__(self):
-        # Create a dataframe from the csv file and load each image into the DataFrame
+    def __init__(self, surface_mode=None, environments=None, memory_budget=None):
+        """
+        Args:
+            surface_mode: Storage mode for tile images. None benchmarks every
+                mode in SURFACE_MODES against the display and uses the fastest;
+                PALETTE_MODE must be asked for.
+            environments: Environments to load now (e.g. ['Sewer']); the rest
+                are loaded on first use. None loads every environment.
+            memory_budget: Byte limit for cut tile images (see memory_usage()).
+                None keeps every tile.
+        """
+        # Create a dataframe from the csv file; sheets are loaded on first use
         wallset_images = pd.read_csv('data/imagefiles.csv')
         wallset_images['Image'] = None
         wallset_images = wallset_images.set_index(['File'])
-
-        for i in wallset_images.index:
-            wallset_images.loc[i, ['Image']] = import_image('Environments', i)
-
         self.wallset_images = wallset_images
 
         # Load sprites.csv with sprite coordinates
@@ -37,6 +69,11 @@ class DungeonTileset(object):
             'Blit_Xpos': int, 'Blit_Ypos': int
         })
 
+        self.panel_positions = {
+            panel: (row['Blit_Xpos'] * SCALE_FACTOR, row['Blit_Ypos'] * SCALE_FACTOR)
+            for panel, row in panels.iterrows()
+        }
+
         # Load tiles.csv and join with sprites and panels
         wall_tiles = pd.read_csv('data/tiles.csv')
         # Use left join to keep tiles even if SpriteName is empty/missing
@@ -52,34 +89,251 @@ class DungeonTileset(object):
 
         # Create new column for Image
         wall_tiles['Image'] = None
+        self.wall_tiles = wall_tiles
+
+        self.surface_mode = surface_mode
+        self.loaded = set()
+        self.memory_budget = memory_budget
+        self.palettes = {}
+        self._current_palettes = {}
+        self._panel_palettes = {}
+
+        # Cut tiles in least to most recently used order: key -> bytes
+        self._resident = OrderedDict()
+        self._resident_bytes = 0
+        self._evicted = set()
+
+        # Merged layer surfaces, built on first use (see stack()), and the
+        # tiles each one was built from
+        self._stacks = {}
+        self._stack_tiles = {}
+
+        if environments is None:
+            environments = self.environments()
+            # Every sheet, including any no tile uses yet (tile_viewer cuts from them)
+            for file in wallset_images.index:
+                self._sheet(file)
+        for environment in environments:
+            self.load_environment(environment)
+
+    def environments(self):
+        """Return the names of every environment in tiles.csv."""
+        return list(self.wall_tiles.index.get_level_values(0).unique())
+
+    def _sheet(self, file):
+        """Return a wallset image, loading it on first use."""
+        image = self.wallset_images.loc[file, 'Image']
+        if image is None:
+            image = import_image('Environments', file)
+            # Sheets are only ever cropped, and cropping out of an RLE-encoded
+            # surface decodes it on every blit
+            image.set_colorkey(None)
+            self.wallset_images.loc[file, ['Image']] = image
+        return image
+
+    def load_environment(self, environment):
+        """
+        Cut an environment's tiles from the wallset sheets.
 
-        # Loop over the dataframe and create images
-        for i in wall_tiles.index:
+        Args:
+            environment: Environment name (e.g., 'Sewer')
+        """
+        if environment in self.loaded:
+            return
+        self.loaded.add(environment)
+
+        wall_tiles = self.wall_tiles
+        positions = [
+            i for i, env in enumerate(wall_tiles.index.get_level_values(0)) if env == environment
+        ]
+        rows = wall_tiles.iloc[positions]
+
+        cut = {}
+        for i, sprite_name, file, x, y, w, h, flip in zip(
+            positions, rows['SpriteName'], rows['File'],
+            rows['Xpos'], rows['Ypos'], rows['Width'], rows['Height'], rows['Flip']
+        ):
             # Skip tiles with no sprite assigned (empty SpriteName)
-            sprite_name = wall_tiles.loc[i, 'SpriteName']
             if pd.isna(sprite_name) or sprite_name == '':
                 continue
 
-            loc_size = (
-                wall_tiles.loc[i, ['Xpos']].item(),
-                wall_tiles.loc[i, ['Ypos']].item(),
-                wall_tiles.loc[i, ['Width']].item(),
-                wall_tiles.loc[i, ['Height']].item()
-            )
-            flip = wall_tiles.loc[i, ['Flip']].item()
-            wall_tiles.loc[i, ['Image']] = sub_image(
-                wallset_images.loc[wall_tiles.loc[i, ['File']].item(), ['Image']].item(),
-                loc_size, flip=flip
+            cut[i] = sub_image(self._sheet(file), (int(x), int(y), int(w), int(h)), flip=flip)
+
+        # Store every tile in the fastest format for blitting to the display
+        if self.surface_mode is None and cut:
+            self.surface_mode, timings = calibrate_surface_mode(list(cut.values()))
+            get_logger('load').info(
+                "Surface mode: %s (%s)", self.surface_mode, ", ".join(
+                    f"{mode} {seconds * 1000:.2f}ms" for mode, seconds in timings.items()
+                )
             )
 
-        self.wall_tiles = wall_tiles
+        palette = None
+        if self.surface_mode == PALETTE_MODE and cut:
+            palette = self.palettes[environment] = build_palette(cut.values())
+            self._current_palettes[environment] = palette
+
+        images = wall_tiles['Image'].tolist()
+        for i, img in cut.items():
+            images[i] = prepare_surface(img, self.surface_mode, palette)
+            self._add_resident(wall_tiles.index[i], images[i])
+        wall_tiles['Image'] = pd.Series(images, index=wall_tiles.index, dtype=object)
+        self._enforce_budget()
 
     def image(self, environment, obj, panel):
+        if environment not in self.loaded:
+            self.load_environment(environment)
         key = (environment, obj, panel)
         if key not in self.wall_tiles.index:
             return None
+        if key in self._evicted:
+            return self._recut(key)
+        if key in self._resident:
+            self._resident.move_to_end(key)
         return self.wall_tiles.loc[key, 'Image']
 
+    def _add_resident(self, key, image):
+        self._resident[key] = surface_bytes(image)
+        self._resident_bytes += self._resident[key]
+
+    def _recut(self, key):
+        """Cut an evicted tile again."""
+        row = self.wall_tiles.loc[key]
+        image = prepare_surface(
+            sub_image(
+                self._sheet(row['File']),
+                (int(row['Xpos']), int(row['Ypos']), int(row['Width']), int(row['Height'])),
+                flip=row['Flip']
+            ),
+            self.surface_mode, self.palettes.get(key[0])
+        )
+        if self.surface_mode == PALETTE_MODE:
+            image.set_palette(self._palette(key[0], key[2]))
+        self.wall_tiles.at[key, 'Image'] = image
+        self._evicted.discard(key)
+        self._add_resident(key, image)
+        self._enforce_budget(keep=key)
+        return image
+
+    def _enforce_budget(self, keep=None):
+        """
+        Drop least recently used tiles until the budget is met.
+
+        Args:
+            keep: Tile key that must stay (the one just cut)
+        """
+        if self.memory_budget is None:
+            return
+
+        while self._resident_bytes > self.memory_budget and self._resident:
+            key = next(iter(self._resident))
+            if key == keep:
+                if len(self._resident) == 1:
+                    break
+                self._resident.move_to_end(key)
+                continue
+
+            self._resident_bytes -= self._resident.pop(key)
+            self.wall_tiles.at[key, 'Image'] = None
+            self._evicted.add(key)
+
+            # Merged stacks hold the tile's pixels (or the tile itself)
+            for stack_key in [k for k, tiles in self._stack_tiles.items() if key in tiles]:
+                del self._stacks[stack_key]
+                del self._stack_tiles[stack_key]
+
+    def apply_palette(self, environment, palette=None, panels=None):
+        """
+        Recolour an environment's tiles by swapping their palette
+        (PALETTE_MODE only), e.g. with utils.shade_palette(). No pixels are
+        touched, so dimming and flashes cost one palette write per surface.
+
+        Args:
+            environment: Environment name
+            palette: Colours indexed like palettes[environment]; None restores
+                the base palette
+            panels: Only recolour these panels (e.g. the depth 3 and 4 panels
+                for distance dimming). None recolours every panel and clears
+                earlier per-panel palettes.
+        """
+        if self.surface_mode != PALETTE_MODE:
+            raise ValueError(f"apply_palette needs surface_mode {PALETTE_MODE!r}")
+        self.load_environment(environment)
+        if palette is None:
+            palette = self.palettes[environment]
+
+        if panels is None:
+            self._current_palettes[environment] = palette
+            for key in [k for k in self._panel_palettes if k[0] == environment]:
+                del self._panel_palettes[key]
+        else:
+            panels = set(panels)
+            for panel in panels:
+                self._panel_palettes[environment, panel] = palette
+
+        for key in self._resident:
+            if key[0] == environment and (panels is None or key[2] in panels):
+                self.wall_tiles.at[key, 'Image'].set_palette(palette)
+        for key, stack in self._stacks.items():
+            if key[0] == environment and (panels is None or key[1] in panels) and stack is not None:
+                stack[0].set_palette(palette)
+
+    def _palette(self, environment, panel):
+        """Return the palette currently applied to a panel's tiles."""
+        return self._panel_palettes.get((environment, panel), self._current_palettes[environment])
+
+    def memory_usage(self):
+        """
+        Report the memory held by decoded surfaces (pixel buffers, in bytes).
+
+        Returns:
+            dict with:
+                'sheets': {file: bytes} for loaded wallset sheets
+                'sprites': {(environment, code, panel): bytes} for cut tiles in memory
+                'environments': {environment: bytes} of cut tiles
+                'duplicates': {(file, x, y, width, height, flip): (copies, bytes)}
+                    for sprites cut more than once, bytes being what the
+                    extra copies take
+                'stacks': bytes of merged stack surfaces (single-layer stacks
+                    share the tile's surface and aren't counted)
+                'total': sum of sheets, sprites and stacks
+        """
+        sheets = {
+            file: surface_bytes(image)
+            for file, image in self.wallset_images['Image'].items() if image is not None
+        }
+
+        sprites = {}
+        environments = {}
+        sources = {}
+        columns = ['Image', 'File', 'Xpos', 'Ypos', 'Width', 'Height', 'Flip']
+        for key, (image, *source) in zip(self.wall_tiles.index, self.wall_tiles[columns].values):
+            if image is None:
+                continue
+            size = surface_bytes(image)
+            sprites[key] = size
+            environments[key[0]] = environments.get(key[0], 0) + size
+            sources.setdefault(tuple(source), []).append(size)
+
+        duplicates = {
+            source: (len(sizes), sum(sizes) - sizes[0])
+            for source, sizes in sources.items() if len(sizes) > 1
+        }
+
+        stacks = sum(
+            surface_bytes(stack[0]) for key, stack in self._stacks.items()
+            if stack is not None and len(self._stack_tiles.get(key, ())) > 1
+        )
+
+        return {
+            'sheets': sheets,
+            'sprites': sprites,
+            'environments': environments,
+            'duplicates': duplicates,
+            'stacks': stacks,
+            'total': sum(sheets.values()) + sum(sprites.values()) + stacks,
+        }
+
     def blit_pos(self, environment, obj, panel):
         key = (environment, obj, panel)
         if key not in self.wall_tiles.index:
@@ -90,3 +344,90 @@ class DungeonTileset(object):
             (row['Blit_Ypos'] + row['Blit_Ypos_Offset']) * SCALE_FACTOR
         )
         return blit_pos
+
+    def stack(self, environment, panel, base, overlays=()):
+        """
+        Return a panel's layers merged into a single surface.
+
+        The base tile (wall or doorframe) sits at the panel position and each
+        overlay (closed door, adornment) at its blit_pos, exactly as if they
+        were blitted one after another. Merged surfaces are built on first use
+        and cached, so only combinations that occur in a level are built.
+
+        The result is clipped to the viewport: the far-left and far-right
+        panels hang off its edges, so only their visible part is blitted and
+        panels entirely outside it are dropped.
+
+        Args:
+            environment: Environment name (e.g., 'Sewer')
+            panel: Panel name (e.g., 'CD1')
+            base: dungeon_map_code drawn at the panel position, or None
+            overlays: Tuple of dungeon_map_codes drawn on top, in order
+
+        Returns:
+            tuple: (image, position, area) ready to blit, or None if nothing
+            visible is drawn
+        """
+        key = (environment, panel, base, overlays)
+        if key not in self._stacks:
+            self._stacks[key] = self._build_stack(key)
+        elif self.memory_budget is not None:
+            # Tiles drawn through a cached stack are still in use
+            for tile in self._stack_tiles[key]:
+                if tile in self._resident:
+                    self._resident.move_to_end(tile)
+        return self._stacks[key]
+
+    def _build_stack(self, key):
+        environment, panel, base, overlays = key
+        layers = []
+        tiles = []
+        if base is not None:
+            img = self.image(environment, base, panel)
+            if img is not None:
+                layers.append((img, self.panel_positions[panel]))
+                tiles.append((environment, base, panel))
+
+        for obj in overlays:
+            img = self.image(environment, obj, panel)
+            pos = self.blit_pos(environment, obj, panel)
+            if img is not None and pos is not None:
+                layers.append((img, pos))
+                tiles.append((environment, obj, panel))
+        self._stack_tiles[key] = tuple(tiles)
+
+        if not layers:
+            return None
+
+        if len(layers) == 1:
+            img, pos = layers[0]
+            rect = pg.Rect(pos, img.get_size())
+            visible = rect.clip(VIEWPORT_RECT)
+            if not visible.width or not visible.height:
+                return None
+            return img, visible.topleft, visible.move(-rect.x, -rect.y)
+
+        # Merge onto a transparent surface covering the visible part of every layer
+        rect = pg.Rect(layers[0][1], layers[0][0].get_size())
+        for img, pos in layers[1:]:
+            rect.union_ip(pg.Rect(pos, img.get_size()))
+        rect = rect.clip(VIEWPORT_RECT)
+        if not rect.width or not rect.height:
+            return None
+
+        if self.surface_mode == PALETTE_MODE:
+            # Same palette as the tiles, so blits copy indices unchanged
+            merged = pg.Surface(rect.size, depth=8)
+            merged.set_palette(self._palette(environment, panel))
+            merged.fill(0)
+        else:
+            merged = pg.Surface(rect.size)
+            merged.fill(COLORKEY)
+        for img, pos in layers:
+            merged.blit(img, (pos[0] - rect.x, pos[1] - rect.y))
+        if self.surface_mode == PALETTE_MODE:
+            merged.set_colorkey(0, pg.RLEACCEL)
+        else:
+            merged = prepare_surface(merged, self.surface_mode)
+
+        return merged, rect.topleft, merged.get_rect()
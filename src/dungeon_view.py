@@ -37,6 +37,126 @@ class WallType:
 # Directions where perpendicular walls use WallsX grid
 HORIZONTAL_FACING = ('E', 'W')
 
+# Panel list in render order (back to front)
+PANELS = (
+    'BG', 'FP4', 'KP4', 'LP4', 'RP4', 'FF3', 'LF3', 'CF3', 'RF3', 'KF3',
+    'CD3', 'LD3', 'RD3', 'FP3', 'LP3', 'RP3', 'KP3', 'LF2', 'CF2', 'RF2',
+    'CD2', 'LD2', 'RD2', 'LP2', 'RP2', 'LF1', 'CF1', 'RF1', 'CD1', 'LD1',
+    'RD1', 'LP1', 'RP1'
+)
+
+# Panel offsets define which dungeon cell to render for each panel.
+# Format: panel_name: {direction: (dx, dy)}
+#
+# The offset is added to the player's (x, y) position to get the
+# dungeon cell coordinates for that panel. Offsets vary by direction
+# to maintain correct perspective as the player rotates.
+PANEL_OFFSETS = {
+    'FP4': {'E': (3, -1), 'W': (-3, 2), 'N': (-1, -3), 'S': (2, 3)},
+    'KP4': {'E': (3, 2), 'W': (-3, -1), 'N': (2, -3), 'S': (-1, 3)},
+    'LP4': {'E': (3, 0), 'W': (-3, 1), 'N': (0, -3), 'S': (1, 3)},
+    'RP4': {'E': (3, 1), 'W': (-3, 0), 'N': (1, -3), 'S': (0, 3)},
+    'FF3': {'E': (3, -2), 'W': (-2, 2), 'N': (-2, -2), 'S': (2, 3)},
+    'LF3': {'E': (3, -1), 'W': (-2, 1), 'N': (-1, -2), 'S': (1, 3)},
+    'CF3': {'E': (3, 0), 'W': (-2, 0), 'N': (0, -2), 'S': (0, 3)},
+    'RF3': {'E': (3, 1), 'W': (-2, -1), 'N': (1, -2), 'S': (-1, 3)},
+    'KF3': {'E': (3, 2), 'W': (-2, -2), 'N': (2, -2), 'S': (-2, 3)},
+    'CD3': {'E': (3, 0), 'W': (-3, 0), 'N': (0, -3), 'S': (0, 3)},
+    'LD3': {'E': (3, -1), 'W': (-3, 1), 'N': (-1, -3), 'S': (1, 3)},
+    'RD3': {'E': (3, 1), 'W': (-3, -1), 'N': (1, -3), 'S': (-1, 3)},
+    'FP3': {'E': (2, -1), 'W': (-2, 2), 'N': (-1, -2), 'S': (2, 2)},
+    'LP3': {'E': (2, 0), 'W': (-2, 1), 'N': (0, -2), 'S': (1, 2)},
+    'RP3': {'E': (2, 1), 'W': (-2, 0), 'N': (1, -2), 'S': (0, 2)},
+    'KP3': {'E': (2, 2), 'W': (-2, -1), 'N': (2, -2), 'S': (-1, 2)},
+    'LF2': {'E': (2, -1), 'W': (-1, 1), 'N': (-1, -1), 'S': (1, 2)},
+    'CF2': {'E': (2, 0), 'W': (-1, 0), 'N': (0, -1), 'S': (0, 2)},
+    'RF2': {'E': (2, 1), 'W': (-1, -1), 'N': (1, -1), 'S': (-1, 2)},
+    'CD2': {'E': (2, 0), 'W': (-2, 0), 'N': (0, -2), 'S': (0, 2)},
+    'LD2': {'E': (2, -1), 'W': (-2, 1), 'N': (-1, -2), 'S': (1, 2)},
+    'RD2': {'E': (2, 1), 'W': (-2, -1), 'N': (1, -2), 'S': (-1, 2)},
+    'LP2': {'E': (1, 0), 'W': (-1, 1), 'N': (0, -1), 'S': (1, 1)},
+    'RP2': {'E': (1, 1), 'W': (-1, 0), 'N': (1, -1), 'S': (0, 1)},
+    'LF1': {'E': (1, -1), 'W': (0, 1), 'N': (-1, 0), 'S': (1, 1)},
+    'CF1': {'E': (1, 0), 'W': (0, 0), 'N': (0, 0), 'S': (0, 1)},
+    'RF1': {'E': (1, 1), 'W': (0, -1), 'N': (1, 0), 'S': (-1, 1)},
+    'CD1': {'E': (1, 0), 'W': (-1, 0), 'N': (0, -1), 'S': (0, 1)},
+    'LD1': {'E': (1, -1), 'W': (-1, 1), 'N': (-1, -1), 'S': (1, 1)},
+    'RD1': {'E': (1, 1), 'W': (-1, -1), 'N': (1, -1), 'S': (-1, 1)},
+    'LP1': {'E': (0, 0), 'W': (0, 1), 'N': (0, 0), 'S': (1, 0)},
+    'RP1': {'E': (0, 1), 'W': (0, 0), 'N': (1, 0), 'S': (0, 0)}
+}
+
+# Step one cell forward per facing direction
+FORWARD = {'N': (0, -1), 'E': (1, 0), 'S': (0, 1), 'W': (-1, 0)}
+
+# view_cells() offsets per direction for PANEL_OFFSETS, worked out on first use
+_VIEW_OFFSETS = {}
+
+
+def panel_cell(panel, direction, panel_offsets=PANEL_OFFSETS):
+    """
+    The cell a panel shows, relative to the party.
+
+    Door panels (D) index the clipping grid, so their offset is the cell.
+    Wall panels (F, P) index a wall grid, where (x, y) is the wall on the
+    north (walls_x) or west (walls_y) edge of cell (x, y); the panel shows
+    the cell on the far side of that wall.
+
+    Args:
+        panel: Panel name (not 'BG')
+        direction: Facing direction
+        panel_offsets: Panel offset table
+
+    Returns:
+        tuple: (dx, dy) from the party's cell
+    """
+    dx, dy = panel_offsets[panel][direction]
+    if panel[1] == 'D':
+        return dx, dy
+
+    # Front walls lie across the facing axis, side walls along it
+    across_rows = (panel[1] == 'F') == (FORWARD[direction][0] == 0)
+    near = (dx, dy - 1) if across_rows else (dx - 1, dy)
+    return max(near, (dx, dy), key=lambda cell: abs(cell[0]) + abs(cell[1]))
+
+
+def view_offsets(direction, panel_offsets=PANEL_OFFSETS):
+    """
+    Offsets of the cells in view facing a direction: the party's own cell
+    and every cell a panel shows, including the far side columns at depth 3
+    (FF3/KF3, FP4/KP4). Nearest first (by depth, then distance to the side).
+
+    Returns:
+        list: (dx, dy) offsets
+    """
+    if panel_offsets is PANEL_OFFSETS and direction in _VIEW_OFFSETS:
+        return _VIEW_OFFSETS[direction]
+
+    fx, fy = FORWARD[direction]
+    cells = {(0, 0)} | {panel_cell(panel, direction, panel_offsets) for panel in panel_offsets}
+    # Depth along the facing direction, then sideways distance (left before right)
+    def order(cell):
+        depth, side = cell[0] * fx + cell[1] * fy, cell[1] * fx - cell[0] * fy
+        return depth, abs(side), side
+    offsets = sorted(cells, key=order)
+    if panel_offsets is PANEL_OFFSETS:
+        _VIEW_OFFSETS[direction] = offsets
+    return offsets
+
+
+def view_cells(x, y, direction, panel_offsets=PANEL_OFFSETS):
+    """
+    The cells in view from a pose, nearest first (see view_offsets()).
+
+    Args:
+        x, y, direction: Party pose
+        panel_offsets: Panel offset table (DungeonView.panel_offsets)
+
+    Returns:
+        list: (x, y) cells
+    """
+    return [(x + dx, y + dy) for dx, dy in view_offsets(direction, panel_offsets)]
+
 
 class DungeonView:
     """
@@ -50,31 +170,32 @@ class DungeonView:
         environment (str): Name of the current environment/tileset (e.g., 'Sewer')
         tiles (dict): Current wall type for each panel
         adornment_panels (dict): Current adornment state for each panel
-        dungeon_tileset (DungeonTileset): Tile image manager
+        dungeon_tileset (DungeonTileset): Tile image manager (None if images aren't loaded)
 
     Panel rendering order (back to front):
         BG -> Depth 4 -> Depth 3 -> Depth 2 -> Depth 1
     """
 
 
-    def __init__(self, environment):
+    def __init__(self, environment, dungeon_tileset=None, load_images=True):
         """
         Initialize the dungeon view for a given environment.
 
         Args:
             environment (str): Name of the environment tileset to use (e.g., 'Sewer')
+            dungeon_tileset: Existing DungeonTileset to share. Default builds a new
+                one with only this environment loaded.
+            load_images (bool): If False and no tileset is given, skip loading
+                images (for headless use that only needs panel states)
         """
         self.environment = environment
-        self.dungeon_tileset = DungeonTileset()
+        if dungeon_tileset is None and load_images:
+            dungeon_tileset = DungeonTileset(environments=[environment])
+        self.dungeon_tileset = dungeon_tileset
 
 
         # Panel list in render order (back to front)
-        self.panels = [
-            'BG', 'FP4', 'KP4', 'LP4', 'RP4', 'FF3', 'LF3', 'CF3', 'RF3', 'KF3',
-            'CD3', 'LD3', 'RD3', 'FP3', 'LP3', 'RP3', 'KP3', 'LF2', 'CF2', 'RF2',
-            'CD2', 'LD2', 'RD2', 'LP2', 'RP2', 'LF1', 'CF1', 'RF1', 'CD1', 'LD1',
-            'RD1', 'LP1', 'RP1'
-        ]
+        self.panels = list(PANELS)
 
         # Pre-compute panel groups by type for efficient iteration
         self._panels_by_type = {
@@ -104,46 +225,8 @@ class DungeonView:
             for panel, row in panels_df.iterrows()
         }
 
-        # Panel offsets define which dungeon cell to render for each panel.
-        # Format: panel_name: {direction: (dx, dy)}
-        #
-        # The offset is added to the player's (x, y) position to get the
-        # dungeon cell coordinates for that panel. Offsets vary by direction
-        # to maintain correct perspective as the player rotates.
-        self.panel_offsets = {
-            'FP4': {'E': (3, -1), 'W': (-3, 2), 'N': (-1, -3), 'S': (2, 3)},
-            'KP4': {'E': (3, 2), 'W': (-3, -1), 'N': (2, -3), 'S': (-1, 3)},
-            'LP4': {'E': (3, 0), 'W': (-3, 1), 'N': (0, -3), 'S': (1, 3)},
-            'RP4': {'E': (3, 1), 'W': (-3, 0), 'N': (1, -3), 'S': (0, 3)},
-            'FF3': {'E': (3, -2), 'W': (-2, 2), 'N': (-2, -2), 'S': (2, 3)},
-            'LF3': {'E': (3, -1), 'W': (-2, 1), 'N': (-1, -2), 'S': (1, 3)},
-            'CF3': {'E': (3, 0), 'W': (-2, 0), 'N': (0, -2), 'S': (0, 3)},
-            'RF3': {'E': (3, 1), 'W': (-2, -1), 'N': (1, -2), 'S': (-1, 3)},
-            'KF3': {'E': (3, 2), 'W': (-2, -2), 'N': (2, -2), 'S': (-2, 3)},
-            'CD3': {'E': (3, 0), 'W': (-3, 0), 'N': (0, -3), 'S': (0, 3)},
-            'LD3': {'E': (3, -1), 'W': (-3, 1), 'N': (-1, -3), 'S': (1, 3)},
-            'RD3': {'E': (3, 1), 'W': (-3, -1), 'N': (1, -3), 'S': (-1, 3)},
-            'FP3': {'E': (2, -1), 'W': (-2, 2), 'N': (-1, -2), 'S': (2, 2)},
-            'LP3': {'E': (2, 0), 'W': (-2, 1), 'N': (0, -2), 'S': (1, 2)},
-            'RP3': {'E': (2, 1), 'W': (-2, 0), 'N': (1, -2), 'S': (0, 2)},
-            'KP3': {'E': (2, 2), 'W': (-2, -1), 'N': (2, -2), 'S': (-1, 2)},
-            'LF2': {'E': (2, -1), 'W': (-1, 1), 'N': (-1, -1), 'S': (1, 2)},
-            'CF2': {'E': (2, 0), 'W': (-1, 0), 'N': (0, -1), 'S': (0, 2)},
-            'RF2': {'E': (2, 1), 'W': (-1, -1), 'N': (1, -1), 'S': (-1, 2)},
-            'CD2': {'E': (2, 0), 'W': (-2, 0), 'N': (0, -2), 'S': (0, 2)},
-            'LD2': {'E': (2, -1), 'W': (-2, 1), 'N': (-1, -2), 'S': (1, 2)},
-            'RD2': {'E': (2, 1), 'W': (-2, -1), 'N': (1, -2), 'S': (-1, 2)},
-            'LP2': {'E': (1, 0), 'W': (-1, 1), 'N': (0, -1), 'S': (1, 1)},
-            'RP2': {'E': (1, 1), 'W': (-1, 0), 'N': (1, -1), 'S': (0, 1)},
-            'LF1': {'E': (1, -1), 'W': (0, 1), 'N': (-1, 0), 'S': (1, 1)},
-            'CF1': {'E': (1, 0), 'W': (0, 0), 'N': (0, 0), 'S': (0, 1)},
-            'RF1': {'E': (1, 1), 'W': (0, -1), 'N': (1, 0), 'S': (-1, 1)},
-            'CD1': {'E': (1, 0), 'W': (-1, 0), 'N': (0, -1), 'S': (0, 1)},
-            'LD1': {'E': (1, -1), 'W': (-1, 1), 'N': (-1, -1), 'S': (1, 1)},
-            'RD1': {'E': (1, 1), 'W': (-1, -1), 'N': (1, -1), 'S': (-1, 1)},
-            'LP1': {'E': (0, 0), 'W': (0, 1), 'N': (0, 0), 'S': (1, 0)},
-            'RP1': {'E': (0, 1), 'W': (0, 0), 'N': (1, 0), 'S': (0, 0)}
-        }
+        # Which dungeon cell each panel shows (see PANEL_OFFSETS)
+        self.panel_offsets = PANEL_OFFSETS
 
     def _create_panel_dict(self, default_value):
         """
@@ -0,0 +1,288 @@
+"""
+Struct-of-arrays store for dungeon entities (monsters, items).
+
+Entities are rows in NumPy columns rather than Python objects, so thousands
+of them take little memory and can be updated with array operations, e.g.
+
+    store.timer[ids] -= dt
+    ready = ids[store.timer[ids] <= 0]
+
+Each level also has an occupancy index: a dense array with one slot per
+cell holding the first entity in that cell, with the rest of the cell's
+entities linked through the `next_in_cell` column. Looking up a cell, or
+every cell in the view cone, costs the number of cells plus the entities
+found, however many entities the dungeon holds. Solid entities are also
+counted in each level's OccupancyGrid, which collision checks use.
+
+Example:
+    store = EntityStore(dungeon.levels)
+    kobold = store.spawn(0, 12, 7, type=KOBOLD, hp=6)
+    store.move(kobold, 12, 8)
+    store.visible(0, *player.level_pos)     # ids in view, nearest first
+"""
+import numpy as np
+
+from .dungeon_view import PANEL_OFFSETS, view_cells
+
+
+# No entity (occupancy index and cell links)
+NONE = -1
+
+# Column name -> dtype
+COLUMNS = {
+    'level': np.int16,
+    'x': np.int32,
+    'y': np.int32,
+    'subcell': np.int8,         # 0-3 floor position within the cell
+    'type': np.int16,           # Game-defined monster/item type number
+    'hp': np.int32,
+    'timer': np.float32,        # Seconds until the entity next acts
+    'updated': np.int64,        # Simulation step last simulated at (NONE = not yet)
+    'solid': np.bool_,          # Blocks its cell (monsters), see DungeonLevel.occupancy
+    'alive': np.bool_,
+    'next_in_cell': np.int32,
+    'prev_in_cell': np.int32,
+}
+
+# Columns that describe an entity (the rest are rebuilt from them), see rows()
+SAVED_COLUMNS = [name for name in COLUMNS if name not in ('alive', 'next_in_cell', 'prev_in_cell')]
+
+
+class EntityStore(object):
+    """
+    Entities as NumPy columns with per-level cell occupancy.
+
+    Columns (arrays indexed by entity id) are attributes named as in
+    COLUMNS. They are replaced when the store grows, so look them up on the
+    store each time rather than keeping references. Rows of despawned
+    entities (alive False) are reused by later spawns.
+
+    Attributes:
+        levels: The DungeonLevels entities can be on
+    """
+
+    def __init__(self, levels, capacity=256, panel_offsets=PANEL_OFFSETS):
+        """
+        Args:
+            levels: DungeonLevels (e.g. dungeon.levels), for the grid sizes
+            capacity: Rows to allocate up front (grows by doubling)
+            panel_offsets: Panel offset table used by visible()
+        """
+        self.levels = levels
+        self.panel_offsets = panel_offsets
+        self._widths = [max(len(row) for row in level.clipping) for level in levels]
+        self._cells = [
+            np.full(width * len(level.clipping), NONE, dtype=np.int32)
+            for width, level in zip(self._widths, levels)
+        ]
+        self._occupancy = [level.occupancy_grid() for level in levels]
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self._free = list(range(capacity - 1, -1, -1))
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _grow(self):
+        capacity = len(self.alive)
+        for name in COLUMNS:
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.zeros_like(column)]))
+        self._free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def _link(self, entity):
+        cells = self._cells[self.level[entity]]
+        index = self.y[entity] * self._widths[self.level[entity]] + self.x[entity]
+        head = cells[index]
+        self.prev_in_cell[entity] = NONE
+        self.next_in_cell[entity] = head
+        if head != NONE:
+            self.prev_in_cell[head] = entity
+        cells[index] = entity
+        if self.solid[entity]:
+            self._occupancy[self.level[entity]].enter(self.x[entity], self.y[entity])
+
+    def _unlink(self, entity):
+        previous, following = self.prev_in_cell[entity], self.next_in_cell[entity]
+        if previous != NONE:
+            self.next_in_cell[previous] = following
+        else:
+            cells = self._cells[self.level[entity]]
+            cells[self.y[entity] * self._widths[self.level[entity]] + self.x[entity]] = following
+        if following != NONE:
+            self.prev_in_cell[following] = previous
+        if self.solid[entity]:
+            self._occupancy[self.level[entity]].leave(self.x[entity], self.y[entity])
+
+    def _check_cell(self, level, x, y):
+        if not (0 <= level < len(self.levels)
+                and 0 <= x < self._widths[level] and 0 <= y < len(self.levels[level].clipping)):
+            raise ValueError(f"Cell ({x}, {y}) is outside level {level}")
+
+    def spawn(self, level, x, y, type=0, hp=0, subcell=0, timer=0.0, solid=False):
+        """
+        Add an entity.
+
+        Args:
+            level: Level index
+            x, y: Cell
+            type: Type number
+            hp: Hit points
+            subcell: Floor position 0-3 within the cell
+            timer: Seconds until it next acts
+            solid: Blocks its cell for the party and other monsters
+                (counted in the level's OccupancyGrid)
+
+        Returns:
+            int: Entity id (row in the columns)
+
+        Raises:
+            ValueError: If the cell is outside the level
+        """
+        self._check_cell(level, x, y)
+        if not self._free:
+            self._grow()
+        entity = self._free.pop()
+        self.level[entity], self.x[entity], self.y[entity] = level, x, y
+        self.type[entity], self.hp[entity] = type, hp
+        self.subcell[entity], self.timer[entity] = subcell, timer
+        self.updated[entity] = NONE
+        self.solid[entity] = solid
+        self.alive[entity] = True
+        self._link(entity)
+        self._count += 1
+        return entity
+
+    def despawn(self, entity):
+        """
+        Remove an entity; its id may be reused by a later spawn.
+
+        Raises:
+            ValueError: If the entity isn't alive
+        """
+        if not self.alive[entity]:
+            raise ValueError(f"Entity {entity} isn't alive")
+        self._unlink(entity)
+        self.alive[entity] = False
+        self._free.append(entity)
+        self._count -= 1
+
+    def move(self, entity, x, y, level=None, subcell=None):
+        """
+        Move an entity to another cell (and optionally level or subcell).
+
+        Args:
+            entity: Entity id
+            x, y: New cell
+            level: New level index (default: stay on the level)
+            subcell: New subcell (default: keep it)
+
+        Raises:
+            ValueError: If the entity isn't alive or the cell is outside the level
+        """
+        if not self.alive[entity]:
+            raise ValueError(f"Entity {entity} isn't alive")
+        self._check_cell(self.level[entity] if level is None else level, x, y)
+        self._unlink(entity)
+        if level is not None:
+            self.level[entity] = level
+        self.x[entity], self.y[entity] = x, y
+        if subcell is not None:
+            self.subcell[entity] = subcell
+        self._link(entity)
+
+    def at(self, level, x, y):
+        """
+        Entities in a cell.
+
+        Returns:
+            list: Entity ids, most recently arrived first
+        """
+        width = self._widths[level]
+        if not (0 <= x < width and 0 <= y < len(self.levels[level].clipping)):
+            return []
+        found = []
+        entity = self._cells[level][y * width + x]
+        following = self.next_in_cell
+        while entity != NONE:
+            found.append(int(entity))
+            entity = following[entity]
+        return found
+
+    def in_cells(self, level, cells):
+        """
+        Entities in any of a list of cells.
+
+        Args:
+            level: Level index
+            cells: (x, y) cells
+
+        Returns:
+            numpy.ndarray: Entity ids, in the order of the cells
+        """
+        found = []
+        for x, y in cells:
+            found.extend(self.at(level, x, y))
+        return np.array(found, dtype=np.int32)
+
+    def visible(self, level, x, y, direction):
+        """
+        Entities in the view cone of a pose (see dungeon_view.view_cells).
+
+        Returns:
+            numpy.ndarray: Entity ids, nearest cells first
+        """
+        return self.in_cells(level, view_cells(x, y, direction, self.panel_offsets))
+
+    def ids(self, level=None):
+        """
+        Every live entity id, optionally only those on one level.
+
+        Returns:
+            numpy.ndarray: Entity ids in ascending order
+        """
+        alive = self.alive if level is None else self.alive & (self.level == level)
+        return np.flatnonzero(alive)
+
+    def rows(self):
+        """
+        The live entities' data, e.g. for a save game.
+
+        Returns:
+            tuple: (ids array, {column name: array of values}) for SAVED_COLUMNS
+        """
+        ids = self.ids()
+        return ids, {name: getattr(self, name)[ids] for name in SAVED_COLUMNS}
+
+    def load_rows(self, ids, columns):
+        """
+        Replace every entity with the rows from rows(), keeping their ids.
+
+        Args:
+            ids: Entity ids
+            columns: Column name -> values per id (unknown columns are
+                ignored, missing ones get spawn()'s defaults)
+
+        Raises:
+            ValueError: If a row's cell is outside its level (nothing is replaced)
+        """
+        if len(ids):
+            levels, xs, ys = (columns.get(name, np.zeros(len(ids), dtype=int)) for name in ('level', 'x', 'y'))
+            for level, x, y in zip(levels.tolist(), xs.tolist(), ys.tolist()):
+                self._check_cell(level, x, y)
+
+        for entity in self.ids():
+            self.despawn(entity)
+        ids = np.asarray(ids, dtype=np.int64)
+        while ids.size and ids.max() >= len(self.alive):
+            self._grow()
+
+        for name in SAVED_COLUMNS:
+            getattr(self, name)[ids] = columns[name] if name in columns else (NONE if name == 'updated' else 0)
+        self.alive[ids] = True
+        taken = set(ids.tolist())
+        self._free = [entity for entity in self._free if entity not in taken]
+        for entity in ids:
+            self._link(entity)
+        self._count = len(ids)
@@ -0,0 +1,301 @@
+"""
+Headless Gym-style environment for automated exploration and regression.
+
+DungeonEnv wraps a Dungeon, Player and DungeonView behind reset()/step()
+without opening a window. Observations are either symbolic panel states or
+rendered viewport pixels. VectorDungeonEnv runs many environments across a
+process pool and steps them together.
+
+Example:
+    env = DungeonEnv(dungeon, observation='pixels')
+    obs = env.reset()
+    obs, reward, done, info = env.step(ACTIONS.index('w'))
+"""
+import copy
+import multiprocessing as mp
+import os
+
+import numpy as np
+import pygame as pg
+
+from .batch_env import VIEW_PANELS
+from .dungeon_tileset import DungeonTileset, VIEWPORT_RECT
+from .dungeon_view import DungeonView
+from .game import Game
+from .player import Player
+from .utils import SCALE_FACTOR
+
+
+# Actions, indexed by action number: Player.move keys plus SPACE (switches)
+ACTIONS = ('w', 's', 'a', 'd', 'q', 'e', 'space')
+
+OBSERVATION_MODES = ('symbolic', 'pixels')
+
+
+def init_headless():
+    """Initialize the pygame display without a window (SDL dummy driver)."""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pg.display.init()
+    if pg.display.get_surface() is None:
+        pg.display.set_mode((1, 1))
+
+
+class DungeonEnv(object):
+    """
+    A single headless game: one party exploring a dungeon.
+
+    Reward is 1 for each cell entered for the first time in an episode.
+    Episodes end after max_steps actions.
+
+    Attributes:
+        dungeon: This episode's copy of the dungeon (doors and levers mutate it)
+        player: The player
+        dungeon_view: Panel state for the player's view
+        steps (int): Actions taken this episode
+    """
+
+    def __init__(self, dungeon, observation='symbolic', max_steps=1000,
+                 native_resolution=True, dungeon_tileset=None):
+        """
+        Args:
+            dungeon: The Dungeon to explore. It is copied; the original is untouched.
+            observation: 'symbolic' for panel states, 'pixels' for viewport arrays
+            max_steps: Episode length in actions
+            native_resolution: Return pixels at 176x120 instead of the scaled viewport
+            dungeon_tileset: Tileset to share between environments (pixels only)
+        """
+        if observation not in OBSERVATION_MODES:
+            raise ValueError(f"Unknown observation mode: {observation}")
+
+        self._pristine = copy.deepcopy(dungeon)
+        self.observation = observation
+        self.max_steps = max_steps
+        self.native_resolution = native_resolution
+
+        if observation == 'pixels':
+            init_headless()
+            self.surface = pg.Surface(VIEWPORT_RECT.size).convert()
+
+        environment = dungeon.levels[dungeon.entry_pos[0]].environment
+        self.dungeon_view = DungeonView(
+            environment, dungeon_tileset, load_images=observation == 'pixels'
+        )
+
+        self.dungeon = None
+        self.player = None
+        self.game = None
+        self.steps = 0
+        self._visited = set()
+
+    @property
+    def level(self):
+        """The DungeonLevel the player is on."""
+        return self.dungeon.levels[self.player.level]
+
+    def reset(self):
+        """
+        Start a new episode from the dungeon's entry position.
+
+        Returns:
+            The first observation
+        """
+        self.dungeon = copy.deepcopy(self._pristine)
+        self.player = Player(self.dungeon)
+        self.game = Game(self.player)
+        self.game.dungeon_view_init(self.dungeon_view)
+
+        self.steps = 0
+        self._visited = {(self.player.level, self.player.x, self.player.y)}
+        self._update_view()
+        return self._observe()
+
+    def step(self, action):
+        """
+        Take one action.
+
+        Args:
+            action: Action number (index into ACTIONS)
+
+        Returns:
+            tuple: (observation, reward, done, info) where info holds 'moved'
+            (bool) and 'pose' (level, x, y, direction)
+        """
+        key = ACTIONS[action]
+        level = self.level
+
+        if key == 'space':
+            door = self.player.click_switch(level.switches, level.adornments, level.clipping)
+            if door is not None:
+                level.door_changed(*door)
+            moved = False
+            self._update_view(swap_background=False)
+        else:
+            moved = self.player.move(level.clipping, key)
+            if moved:
+                self._update_view()
+
+        reward = 0.0
+        cell = (self.player.level, self.player.x, self.player.y)
+        if cell not in self._visited:
+            self._visited.add(cell)
+            reward = 1.0
+
+        self.steps += 1
+        done = self.steps >= self.max_steps
+        info = {'moved': moved, 'pose': self.player.dungeon_pos}
+        return self._observe(), reward, done, info
+
+    def _update_view(self, swap_background=True):
+        level = self.level
+        self.dungeon_view.update_panels(
+            self.player.level_pos,
+            level.walls_x,
+            level.walls_y,
+            level.adornments,
+            level.clipping,
+            swap_background=swap_background
+        )
+
+    def _observe(self):
+        if self.observation == 'symbolic':
+            return tuple(
+                (self.dungeon_view.tiles[p], self.dungeon_view.adornment_panels[p])
+                for p in VIEW_PANELS
+            )
+        return self.render()
+
+    def render(self):
+        """
+        Render the viewport.
+
+        Returns:
+            np.ndarray: uint8 RGB array of shape (height, width, 3)
+        """
+        self.game.render_view(self.surface)
+        pixels = pg.surfarray.pixels3d(self.surface)
+        if self.native_resolution:
+            pixels = pixels[::SCALE_FACTOR, ::SCALE_FACTOR]
+        frame = pixels.transpose(1, 0, 2).copy()
+        del pixels  # Release the surface lock before the next render
+        return frame
+
+
+def _worker(conn, dungeon, count, env_kwargs):
+    """Run a slice of a VectorDungeonEnv's environments in a child process."""
+    tileset = None
+    if env_kwargs.get('observation') == 'pixels':
+        init_headless()
+        # Only the level the episodes start on; DungeonTileset loads any other on first use
+        tileset = DungeonTileset(environments=[dungeon.levels[dungeon.entry_pos[0]].environment])
+
+    envs = [DungeonEnv(dungeon, dungeon_tileset=tileset, **env_kwargs) for _ in range(count)]
+
+    while True:
+        command, data = conn.recv()
+        if command == 'reset':
+            conn.send([env.reset() for env in envs])
+        elif command == 'step':
+            results = []
+            for env, action in zip(envs, data):
+                obs, reward, done, info = env.step(action)
+                if done:
+                    # Start the next episode straight away, keeping the last frame
+                    info['final_observation'] = obs
+                    obs = env.reset()
+                results.append((obs, reward, done, info))
+            conn.send(results)
+        elif command == 'close':
+            conn.close()
+            return
+
+
+class VectorDungeonEnv(object):
+    """
+    Many DungeonEnvs stepped together across a process pool.
+
+    Environments are split evenly across worker processes. Finished episodes
+    reset automatically; the last observation is kept in
+    info['final_observation'].
+    """
+
+    def __init__(self, dungeon, num_envs, num_workers=None, **env_kwargs):
+        """
+        Args:
+            dungeon: The Dungeon every environment explores
+            num_envs: Number of environments
+            num_workers: Worker processes. Default is one per CPU core.
+            **env_kwargs: Passed on to DungeonEnv
+        """
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        num_workers = max(1, min(num_workers, num_envs))
+
+        self.num_envs = num_envs
+        self.observation = env_kwargs.get('observation', 'symbolic')
+
+        # Environments per worker, spreading the remainder over the first workers
+        base, extra = divmod(num_envs, num_workers)
+        self._counts = [base + (1 if i < extra else 0) for i in range(num_workers)]
+
+        # Spawn rather than fork: forked children inherit the parent's SDL state
+        context = mp.get_context('spawn')
+
+        self._conns = []
+        self._processes = []
+        for count in self._counts:
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_worker, args=(child, dungeon, count, env_kwargs), daemon=True
+            )
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+
+    def _stack(self, observations):
+        if self.observation == 'pixels':
+            return np.stack(observations)
+        return observations
+
+    def reset(self):
+        """
+        Reset every environment.
+
+        Returns:
+            Observations, one per environment (stacked array for pixels)
+        """
+        for conn in self._conns:
+            conn.send(('reset', None))
+        observations = [obs for conn in self._conns for obs in conn.recv()]
+        return self._stack(observations)
+
+    def step(self, actions):
+        """
+        Take one action in every environment.
+
+        Args:
+            actions: Action numbers, one per environment
+
+        Returns:
+            tuple: (observations, rewards, dones, infos)
+        """
+        start = 0
+        for conn, count in zip(self._conns, self._counts):
+            conn.send(('step', list(actions[start:start + count])))
+            start += count
+
+        results = [result for conn in self._conns for result in conn.recv()]
+        observations, rewards, dones, infos = zip(*results)
+        return (
+            self._stack(list(observations)),
+            np.array(rewards, dtype=np.float32),
+            np.array(dones, dtype=bool),
+            list(infos)
+        )
+
+    def close(self):
+        """Shut down the worker processes."""
+        for conn in self._conns:
+            conn.send(('close', None))
+        for process in self._processes:
+            process.join()
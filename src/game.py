@@ -2,6 +2,16 @@ import pygame as pg
 import sys
 import os
 
+from .clock import GameClock
+from .cursor import Cursor
+from .scheduler import Scheduler
+from .utils import COLORKEY
+
+
+# Simulation steps per second and default render cap (frames per second)
+SIM_RATE = 60
+RENDER_FPS = 60
+
 
 class Game(object):
     """
@@ -11,122 +21,176 @@ class Game(object):
         player: The player object
         dungeon_view: The dungeon view for rendering
         window: The pygame window surface
-        clock: The pygame clock for frame timing
+        frame: Cached copy of the last rendered scene (without the cursor)
+        cursor: The mouse cursor
+        clock: Fixed-timestep game clock (simulation steps and render cap)
+        scheduler: Timed game events, advanced one step per simulation step
+        needs_redraw (bool): True if the scene must be re-rendered on the next redraw
     """
 
-    def __init__(self, player):
+    def __init__(self, player, sim_rate=SIM_RATE, render_fps=RENDER_FPS):
+        """
+        Args:
+            player: The player object
+            sim_rate: Simulation steps per second
+            render_fps: Render cap in frames per second (lower it on low-power machines)
+        """
         self.player = player
         self.window_size = (960, 600)
+        self.needs_redraw = True
+        self.sim_rate = sim_rate
+        self.render_fps = render_fps
+        self.scheduler = Scheduler(1.0 / sim_rate)
+
+        # UI overlay per facing direction, loaded on first use
+        self._ui = {}
 
     def dungeon_view_init(self, dungeon_view):
         self.dungeon_view = dungeon_view
+        self.invalidate()
+
+    def invalidate(self):
+        """Mark the scene as changed so the next redraw renders it in full."""
+        self.needs_redraw = True
 
     def launch(self):
-        # Initialize Pygame
-        pg.init()
-        pg.font.init()
+        # Initialize only the display (pg.init() would also start audio, joysticks, ...)
+        pg.display.init()
 
         # Set the Pygame window icon and title
         pg.display.set_icon(pg.image.load('assets/eob_icon.png'))
         pg.display.set_caption('Py of the Beholder')
 
         self.window = pg.display.set_mode(self.window_size)
-        self.clock = pg.time.Clock()
+        self.frame = pg.Surface(self.window_size).convert()
+        self.clock = GameClock(self.sim_rate, self.render_fps)
 
-        pg.mouse.set_visible(False)
-
-        scale_factor = 2
-        self.cursor_image = pg.image.load("assets/Environments/itemicn.png")
-
-        cursor_size = (
-            self.cursor_image.get_width() * scale_factor,
-            self.cursor_image.get_height() * scale_factor
-        )
-        self.cursor_image = pg.transform.scale(self.cursor_image, cursor_size)
-
-        self.cursor_image.set_colorkey((255, 0, 255), pg.RLEACCEL)
-        self.cursor_image = self.cursor_image.convert()
+        self.cursor = Cursor()
 
     def quit(self):
         pg.quit()
         sys.exit(0)
 
     def tick(self):
-        self.clock.tick(60)
+        """Wait for the next simulation step, then run every step that is due."""
+        self.clock.wait()
+        for dt in self.clock.steps():
+            self.update(dt)
+
+    def update(self, dt):
+        """
+        Advance real-time game state by one fixed simulation step.
+
+        Monsters, spells and animations (BUILD_PLAN Phase 2) schedule their
+        events on self.scheduler, so they run at the simulation rate, not
+        the render rate.
+
+        Args:
+            dt: Timestep in seconds
+        """
+        self.scheduler.tick()
 
     def redraw_window(self):
-        # Render all the wall panels and environment
-        for panel in self.dungeon_view.panels:
-            tile_value = self.dungeon_view.tiles[panel]
-
-            # Check if this is a door panel (has 'D' in name like CD1, LD2, RD3)
-            is_door_panel = len(panel) >= 2 and 'D' in panel and panel != 'BG'
-
-            # For door panels, always render the doorframe (type '2') first
-            if is_door_panel and tile_value in '23':
-                # Render the doorframe (open door appearance)
-                img = self.dungeon_view.dungeon_tileset.image(
-                    self.dungeon_view.environment,
-                    '2',
-                    panel
-                )
-                if img is not None:
-                    self.window.blit(img, self.dungeon_view.panel_positions[panel])
-
-                # If door is closed (type '3'), also render the door sprite on top
-                if tile_value == '3':
-                    img = self.dungeon_view.dungeon_tileset.image(
-                        self.dungeon_view.environment,
-                        '3',
-                        panel
-                    )
-                    if img is not None:
-                        # Use the blit position offset from CSV for door positioning
-                        blit_offset = self.dungeon_view.dungeon_tileset.blit_pos(
-                            self.dungeon_view.environment,
-                            '3',
-                            panel
-                        )
-                        if blit_offset is not None:
-                            self.window.blit(img, blit_offset)
-
-            # Render regular wall panels (skip empty 'X' and clipping values 0,1,4)
-            elif tile_value not in 'X014':
-                img = self.dungeon_view.dungeon_tileset.image(
-                    self.dungeon_view.environment,
-                    tile_value,
-                    panel
-                )
-                if img is not None:
-                    self.window.blit(img, self.dungeon_view.panel_positions[panel])
-
-            # Render the Adornment
-            adornment_name = self.dungeon_view.adornment_panels[panel]
-            if adornment_name != 'x':
-                img = self.dungeon_view.dungeon_tileset.image(
-                    self.dungeon_view.environment,
-                    adornment_name,
-                    panel
-                )
-                if img is not None:
-                    blit_pos = self.dungeon_view.dungeon_tileset.blit_pos(
-                        self.dungeon_view.environment,
-                        adornment_name,
-                        panel
-                    )
-                    if blit_pos is not None:
-                        self.window.blit(img, blit_pos)
+        """
+        Update the display.
 
-        # Render the UI
-        ui = pg.transform.scale(
-            pg.image.load(os.path.join('assets', 'UI', self.player.direction + '.png')).convert(),
-            self.window_size
-        )
-        ui.set_colorkey((255, 0, 255), pg.RLEACCEL)
-        ui = ui.convert()
-        self.window.blit(ui, (0, 0))
+        The scene is only re-rendered after invalidate(); otherwise just the
+        software cursor's old and new rects are refreshed from the cached frame.
+        Nothing is drawn while the render cap is in effect.
+        """
+        if not self.clock.render_due():
+            return
+
+        if not self.needs_redraw:
+            dirty = self.cursor.refresh(self.window, self.frame)
+            if dirty:
+                pg.display.update(dirty)
+                self.clock.rendered()
+            return
+
+        self.render_scene(self.frame)
+        self.needs_redraw = False
 
-        self.window.blit(self.cursor_image, pg.mouse.get_pos(), (0, 0, 22, 32))
+        self.window.blit(self.frame, (0, 0))
+        self.cursor.draw(self.window)
 
         # Display it in pygame
         pg.display.update()
+        self.clock.rendered()
+
+    def render_scene(self, surface):
+        """
+        Render the dungeon view and UI overlay.
+
+        Args:
+            surface: Surface to render onto
+        """
+        self.render_view(surface)
+
+        # Render the UI
+        surface.blit(self._ui_overlay(self.player.direction), (0, 0))
+
+    def _ui_overlay(self, direction):
+        """Return the UI overlay (compass etc.) for a facing direction."""
+        if direction not in self._ui:
+            ui = pg.transform.scale(
+                pg.image.load(os.path.join('assets', 'UI', direction + '.png')).convert(),
+                self.window_size
+            )
+            ui.set_colorkey(COLORKEY, pg.RLEACCEL)
+            self._ui[direction] = ui.convert()
+        return self._ui[direction]
+
+    def render_view(self, surface):
+        """
+        Render the dungeon viewport (wall panels and environment) only.
+
+        Args:
+            surface: Surface to render onto; the viewport is drawn at (0, 0)
+        """
+        environment = self.dungeon_view.environment
+        tileset = self.dungeon_view.dungeon_tileset
+
+        # One merged blit per panel
+        for panel in self.dungeon_view.panels:
+            base, overlays = self._panel_layers(panel)
+            layer = tileset.stack(environment, panel, base, overlays)
+            if layer is not None:
+                surface.blit(*layer)
+
+    def _panel_layers(self, panel):
+        """
+        Work out which tiles a panel draws.
+
+        Args:
+            panel: Panel name
+
+        Returns:
+            tuple: (base, overlays) where base is the dungeon_map_code drawn at
+            the panel position (or None) and overlays is a tuple of codes drawn
+            on top at their own blit positions
+        """
+        tile_value = self.dungeon_view.tiles[panel]
+        base = None
+        overlays = []
+
+        # Check if this is a door panel (has 'D' in name like CD1, LD2, RD3)
+        is_door_panel = len(panel) >= 2 and 'D' in panel and panel != 'BG'
+
+        # For door panels, always render the doorframe (type '2') first,
+        # with the door sprite on top if the door is closed (type '3')
+        if is_door_panel and tile_value in '23':
+            base = '2'
+            if tile_value == '3':
+                overlays.append('3')
+
+        # Render regular wall panels (skip empty 'X' and clipping values 0,1,4)
+        elif tile_value not in 'X014':
+            base = tile_value
+
+        # Adornment on top of the wall
+        adornment_name = self.dungeon_view.adornment_panels[panel]
+        if adornment_name != 'x':
+            overlays.append(adornment_name)
+
+        return base, tuple(overlays)
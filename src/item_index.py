@@ -0,0 +1,142 @@
+"""
+Floor item placement by cell and subcell.
+
+Each cell has four subcell positions for items, like Eye of the Beholder:
+0 north-west, 1 north-east, 2 south-west, 3 south-east. The index keeps a
+dense list with one slot per cell (flat index y * width + x) holding None
+or that cell's four subcell stacks, so a lookup is O(1) and drops and
+pickups only touch one stack. Items can be anything: EntityStore ids,
+names or objects.
+
+Example:
+    items = level.item_index()
+    items.drop(12, 7, 3, dagger)
+    for cell, subcells in items.in_view(*player.level_pos):
+        ...                                 # draw each stack, see VIEW_SUBCELLS
+    items.pickup(12, 7, 3)                  # -> dagger
+"""
+from .dungeon_view import PANEL_OFFSETS, view_cells
+
+
+# Subcell names by number
+SUBCELLS = ('NW', 'NE', 'SW', 'SE')
+
+# Subcells as seen facing each direction: (far left, far right, near left, near right)
+VIEW_SUBCELLS = {
+    'N': (0, 1, 2, 3),
+    'E': (1, 3, 0, 2),
+    'S': (3, 2, 1, 0),
+    'W': (2, 0, 3, 1),
+}
+
+_EMPTY = ((), (), (), ())
+
+
+class ItemIndex(object):
+    """
+    Items lying on a DungeonLevel's floor by cell and subcell.
+
+    Each subcell holds a stack; the last item dropped is on top and is the
+    one picked up.
+
+    Attributes:
+        width, height: Level size in cells
+    """
+
+    def __init__(self, level, panel_offsets=PANEL_OFFSETS):
+        """
+        Args:
+            level: DungeonLevel (its clipping grid gives the size)
+            panel_offsets: Panel offset table used by in_view()
+        """
+        self.height = len(level.clipping)
+        self.width = max(len(row) for row in level.clipping)
+        self.panel_offsets = panel_offsets
+        self._cells = [None] * (self.width * self.height)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _index(self, x, y):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"Cell ({x}, {y}) is outside the level")
+        return y * self.width + x
+
+    def drop(self, x, y, subcell, item):
+        """
+        Put an item on top of a subcell's stack.
+
+        Args:
+            x, y: Cell
+            subcell: 0-3 (see SUBCELLS)
+            item: The item
+        """
+        index = self._index(x, y)
+        stacks = self._cells[index]
+        if stacks is None:
+            stacks = self._cells[index] = ([], [], [], [])
+        stacks[subcell].append(item)
+        self._count += 1
+
+    def pickup(self, x, y, subcell):
+        """
+        Take the top item off a subcell's stack.
+
+        Returns:
+            The item, or None if the subcell is empty
+        """
+        index = self._index(x, y)
+        stacks = self._cells[index]
+        if stacks is None or not stacks[subcell]:
+            return None
+        item = stacks[subcell].pop()
+        self._count -= 1
+        if not any(stacks):
+            self._cells[index] = None
+        return item
+
+    def remove(self, x, y, subcell, item):
+        """Take a particular item out of a subcell's stack (ValueError if it isn't there)."""
+        index = self._index(x, y)
+        stacks = self._cells[index]
+        if stacks is None:
+            raise ValueError(f"No items at ({x}, {y})")
+        stacks[subcell].remove(item)
+        self._count -= 1
+        if not any(stacks):
+            self._cells[index] = None
+
+    def at(self, x, y):
+        """
+        The items in a cell.
+
+        Returns:
+            tuple: Four sequences (by subcell) of items, bottom of the stack
+            first; empty outside the level. Don't modify them.
+        """
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return _EMPTY
+        return self._cells[y * self.width + x] or _EMPTY
+
+    def top(self, x, y, subcell):
+        """The item on top of a subcell's stack, or None."""
+        stack = self.at(x, y)[subcell]
+        return stack[-1] if stack else None
+
+    def in_view(self, x, y, direction):
+        """
+        The items in every cell in view from a pose (see dungeon_view.view_cells).
+
+        Returns:
+            list: ((x, y), subcells) for each cell in view holding items,
+            nearest first, where subcells is as returned by at()
+        """
+        found = []
+        cells, width, height = self._cells, self.width, self.height
+        for cx, cy in view_cells(x, y, direction, self.panel_offsets):
+            if 0 <= cx < width and 0 <= cy < height:
+                stacks = cells[cy * width + cx]
+                if stacks is not None:
+                    found.append(((cx, cy), stacks))
+        return found
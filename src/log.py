@@ -0,0 +1,148 @@
+"""
+Leveled, per-category logging for the game.
+
+Each category (movement, render, load) is a standard logging.Logger named
+'pob.<category>' with its own level. Records are handed to a queue and
+written out by a background thread, so a slow terminal or pipe never stalls
+the game loop.
+
+Hot paths ask for a hook() up front: it is None when the category is
+disabled at that level, so a disabled category costs a single `is None`
+check.
+
+Levels can be set per category with the POB_LOG environment variable:
+    POB_LOG=movement=debug,render=debug python main.py
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+
+CATEGORIES = ('movement', 'render', 'load')
+
+# Default level per category: movement and render chatter is off unless asked for
+DEFAULT_LEVELS = {
+    'movement': logging.WARNING,
+    'render': logging.WARNING,
+    'load': logging.INFO,
+}
+
+_listener = None
+_queue_handler = None      # Feeds _listener while it runs
+_direct_handler = None     # Writes records directly after shutdown()
+_registered = False        # shutdown() registered with atexit
+
+
+def get_logger(category):
+    """
+    Return the logger for a category.
+
+    Args:
+        category: One of CATEGORIES
+    """
+    if category not in CATEGORIES:
+        raise ValueError(f"Unknown log category: {category}")
+    return logging.getLogger('pob.' + category)
+
+
+def _parse_levels(spec):
+    """
+    Parse 'category=level,...' (e.g. 'movement=debug') into a dict.
+
+    Returns:
+        tuple: (dict of category -> level, list of entries that were skipped
+        because the category or level is unknown)
+    """
+    levels, skipped = {}, []
+    for item in spec.split(','):
+        if '=' not in item:
+            continue
+        category, level = (part.strip() for part in item.split('=', 1))
+        number = logging.getLevelName(level.upper())
+        if category not in CATEGORIES or not isinstance(number, int):
+            skipped.append(item.strip())
+            continue
+        levels[category] = number
+    return levels, skipped
+
+
+def configure(levels=None, stream=None):
+    """
+    Set category levels and start the background writer. Safe to call again
+    to change levels.
+
+    Args:
+        levels: Dict of category -> level. Missing categories use
+            DEFAULT_LEVELS, overridden by the POB_LOG environment variable.
+        stream: Where records are written. Default is stderr.
+    """
+    merged = dict(DEFAULT_LEVELS)
+    from_env, skipped = _parse_levels(os.environ.get('POB_LOG', ''))
+    merged.update(from_env)
+    merged.update(levels or {})
+    for category, level in merged.items():
+        get_logger(category).setLevel(level)
+
+    if _listener is None:
+        _start(stream)
+    for item in skipped:
+        get_logger('load').warning("Ignoring POB_LOG entry %r: unknown category or level", item)
+
+
+def _start(stream):
+    """Route the 'pob' loggers through a queue to a background writer."""
+    global _listener, _queue_handler, _direct_handler, _registered
+
+    root = logging.getLogger('pob')
+    root.propagate = False
+    if _direct_handler is not None:
+        root.removeHandler(_direct_handler)
+        _direct_handler = None
+
+    records = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(records)
+    root.addHandler(_queue_handler)
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter('[%(name)s] %(levelname)s: %(message)s'))
+    _listener = logging.handlers.QueueListener(records, handler)
+    _listener.start()
+    if not _registered:
+        atexit.register(shutdown)
+        _registered = True
+
+
+def shutdown():
+    """
+    Flush queued records and stop the background writer. Records logged
+    afterwards are written directly (synchronously) to the same stream.
+    """
+    global _listener, _queue_handler, _direct_handler
+    if _listener is not None:
+        _listener.stop()
+        root = logging.getLogger('pob')
+        root.removeHandler(_queue_handler)
+        _direct_handler = _listener.handlers[0]
+        root.addHandler(_direct_handler)
+        _listener = _queue_handler = None
+
+
+def hook(category, level=logging.DEBUG):
+    """
+    Return a logging function for a hot path, or None if disabled.
+
+    Args:
+        category: One of CATEGORIES
+        level: Level the messages are logged at
+
+    Returns:
+        A callable taking a message, or None if the category is disabled at
+        that level (check once, then skip the call entirely)
+    """
+    logger = get_logger(category)
+    if not logger.isEnabledFor(level):
+        return None
+    return lambda message: logger.log(level, message)
@@ -0,0 +1,98 @@
+"""
+Dynamic occupancy: static clipping and solid entities in one grid.
+
+Each cell holds a count: 1 if the clipping blocks it (wall or closed door)
+plus the number of solid entities (monsters) standing in it. A cell is
+passable when its count is 0, so Player.move and monster AI test
+passability with one lookup, however many monsters there are.
+
+The counts are kept up to date incrementally: door changes arrive through
+DungeonLevel.door_changed, and the EntityStore calls enter()/leave() as
+solid entities spawn, move and despawn. The party itself isn't counted.
+
+Example:
+    occupancy = level.occupancy_grid()
+    occupancy.passable(12, 7)
+    occupancy.passable_many(xs, ys)         # bool array
+"""
+import numpy as np
+
+from .pathfinding import PathGrid
+from .player import BLOCKING
+
+
+class OccupancyGrid(object):
+    """
+    Passability of a DungeonLevel's cells, including solid entities.
+
+    The grid has a one-cell blocked border, so cells just outside the level
+    are impassable rather than an error.
+
+    Attributes:
+        level: The DungeonLevel
+        width, height: Level size in cells
+    """
+
+    def __init__(self, level):
+        """
+        Args:
+            level: DungeonLevel (the grid registers for its door changes)
+        """
+        self.level = level
+        walkable = PathGrid(level.clipping).to_array()
+        self.height, self.width = walkable.shape
+        self.stride = self.width + 2
+
+        static = np.ones((self.height + 2, self.stride), dtype=bool)
+        static[1:-1, 1:-1] = ~walkable
+        self._static = static.ravel()
+        self._counts = self._static.astype(np.int16)
+
+        level.add_door_listener(self.door_changed)
+
+    def _index(self, x, y):
+        return (y + 1) * self.stride + x + 1
+
+    def passable(self, x, y):
+        """Return True if nothing blocks (x, y): not a wall, closed door or solid entity."""
+        if not (-1 <= x <= self.width and -1 <= y <= self.height):
+            return False
+        return self._counts[(y + 1) * self.stride + x + 1] == 0
+
+    def passable_many(self, xs, ys):
+        """
+        Passability of many cells at once (each within one cell of the level).
+
+        Args:
+            xs, ys: Integer arrays of cells
+
+        Returns:
+            numpy.ndarray: bool per cell
+        """
+        return self._counts[(np.asarray(ys) + 1) * self.stride + np.asarray(xs) + 1] == 0
+
+    def occupants(self, x, y):
+        """Number of solid entities counted in (x, y)."""
+        index = self._index(x, y)
+        return int(self._counts[index]) - int(self._static[index])
+
+    def enter(self, x, y):
+        """Count a solid entity into (x, y)."""
+        self._counts[self._index(x, y)] += 1
+
+    def leave(self, x, y):
+        """Count a solid entity out of (x, y)."""
+        self._counts[self._index(x, y)] -= 1
+
+    def door_changed(self, x, y):
+        """
+        Update (x, y) after its door opened or closed.
+
+        Args:
+            x, y: Door cell (clipping[y][x])
+        """
+        index = self._index(x, y)
+        blocked = self.level.clipping[y][x] in BLOCKING
+        if blocked != self._static[index]:
+            self._static[index] = blocked
+            self._counts[index] += 1 if blocked else -1
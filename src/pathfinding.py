@@ -0,0 +1,385 @@
+"""
+Grid pathfinding over a DungeonLevel's clipping grid.
+
+Movement is 4-connected (like the player's) and every step costs 1. Cells
+with a clipping value in player.BLOCKING (walls, closed doors) can't be
+entered.
+
+PathGrid is a compact copy of the walkable cells (one byte per cell, flat
+index y * width + x). astar() and jps() (Jump Point Search for 4-connected
+grids) find shortest paths on it. PathFinder wraps both with a path cache
+and batched queries, and listens for door changes on its level (see
+DungeonLevel.door_changed) so cached paths are only dropped when a door
+opens or closes.
+
+Example:
+    finder = PathFinder(level)
+    path = finder.find((7, 13), (13, 13))      # [(7, 13), ..., (13, 13)]
+    paths = finder.find_many([(a, goal), (b, goal)])
+"""
+import copy
+import heapq
+from collections import deque
+
+import numpy as np
+
+from .player import BLOCKING
+
+
+# Path search algorithms, see PathFinder.find()
+METHODS = ('astar', 'jps')
+
+# Neighbour steps (dx, dy)
+_STEPS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+
+class PathGrid(object):
+    """
+    Walkable cells of a clipping grid.
+
+    Attributes:
+        width, height: Grid size (rows may be ragged in level files; the
+            grid is as wide as the longest row, missing cells blocked)
+        walkable (bytearray): 1 if the cell can be entered, by flat index
+    """
+
+    def __init__(self, clipping):
+        """
+        Args:
+            clipping: 2D clipping grid, indexed clipping[y][x]
+        """
+        self.height = len(clipping)
+        self.width = max(len(row) for row in clipping)
+        self.walkable = bytearray(self.width * self.height)
+        for y, row in enumerate(clipping):
+            for x, value in enumerate(row):
+                if value not in BLOCKING:
+                    self.walkable[y * self.width + x] = 1
+
+    def is_walkable(self, x, y):
+        """Return True if (x, y) is inside the grid and can be entered."""
+        return 0 <= x < self.width and 0 <= y < self.height and self.walkable[y * self.width + x] == 1
+
+    def set_cell(self, x, y, clipping_value):
+        """Update one cell from its clipping value (e.g. after a door toggles)."""
+        self.walkable[y * self.width + x] = clipping_value not in BLOCKING
+
+    def copy(self):
+        """Return an independent copy of the grid."""
+        grid = copy.copy(self)
+        grid.walkable = bytearray(self.walkable)
+        return grid
+
+    def to_array(self):
+        """Return the walkable cells as a (height, width) bool array."""
+        return np.frombuffer(bytes(self.walkable), dtype=np.uint8).reshape(self.height, self.width) == 1
+
+
+def _trace(parents, end, width):
+    """Follow parent links back from end; returns (x, y) cells, last one first."""
+    path = []
+    index = end
+    while index is not None:
+        path.append((index % width, index // width))
+        index = parents[index]
+    return path
+
+
+def astar(grid, start, goal):
+    """
+    Shortest path with A* (Manhattan distance heuristic).
+
+    Args:
+        grid: PathGrid
+        start, goal: (x, y) cells
+
+    Returns:
+        list: (x, y) cells from start to goal inclusive, or None if the goal
+        can't be reached
+    """
+    if not (grid.is_walkable(*start) and grid.is_walkable(*goal)):
+        return None
+
+    width, walkable = grid.width, grid.walkable
+    gx, gy = goal
+    start_index = start[1] * width + start[0]
+    goal_index = gy * width + gx
+
+    cost = {start_index: 0}
+    parents = {start_index: None}
+    heap = [(abs(start[0] - gx) + abs(start[1] - gy), 0, start_index)]
+
+    while heap:
+        _, g, index = heapq.heappop(heap)
+        if index == goal_index:
+            path = _trace(parents, index, width)
+            path.reverse()
+            return path
+        if g > cost[index]:
+            continue
+
+        x, y = index % width, index // width
+        for dx, dy in _STEPS:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < width and 0 <= ny < grid.height):
+                continue
+            neighbour = ny * width + nx
+            if not walkable[neighbour]:
+                continue
+            if g + 1 < cost.get(neighbour, g + 2):
+                cost[neighbour] = g + 1
+                parents[neighbour] = index
+                heapq.heappush(heap, (g + 1 + abs(nx - gx) + abs(ny - gy), g + 1, neighbour))
+
+    return None
+
+
+def _jump(grid, x, y, dx, dy, goal):
+    """
+    Jump from (x, y) in direction (dx, dy) to the next jump point.
+
+    Horizontal jumps stop next to a forced neighbour: an open cell above or
+    below whose cell behind is blocked. Vertical jumps stop where a
+    horizontal jump from the cell finds a jump point.
+
+    Returns:
+        (x, y) of the jump point, or None if the jump runs into a wall
+    """
+    is_walkable = grid.is_walkable
+    while True:
+        x += dx
+        y += dy
+        if not is_walkable(x, y):
+            return None
+        if (x, y) == goal:
+            return x, y
+
+        if dx:
+            if (is_walkable(x, y - 1) and not is_walkable(x - dx, y - 1)) or \
+                    (is_walkable(x, y + 1) and not is_walkable(x - dx, y + 1)):
+                return x, y
+        else:
+            if _jump(grid, x, y, 1, 0, goal) is not None or _jump(grid, x, y, -1, 0, goal) is not None:
+                return x, y
+
+
+def _jps_directions(grid, x, y, parent):
+    """Directions to search from a jump point given the cell it was reached from."""
+    if parent is None:
+        return _STEPS
+
+    px, py = parent
+    dx = (x > px) - (x < px)
+    dy = (y > py) - (y < py)
+    if dx:
+        # Straight on, plus any forced neighbour above or below
+        directions = [(dx, 0)]
+        for side in (-1, 1):
+            if grid.is_walkable(x, y + side) and not grid.is_walkable(x - dx, y + side):
+                directions.append((0, side))
+        return directions
+
+    # Vertical: straight on and both horizontals
+    return [(0, dy), (1, 0), (-1, 0)]
+
+
+def jps(grid, start, goal):
+    """
+    Shortest path with Jump Point Search (4-connected variant).
+
+    Expands only jump points, so long corridors and open rooms cost a few
+    heap operations instead of one per cell. Returns the same path length
+    as astar() (the cells may differ where several shortest paths exist).
+
+    Args:
+        grid: PathGrid
+        start, goal: (x, y) cells
+
+    Returns:
+        list: (x, y) cells from start to goal inclusive, or None
+    """
+    if not (grid.is_walkable(*start) and grid.is_walkable(*goal)):
+        return None
+
+    start, goal = tuple(start), tuple(goal)
+    gx, gy = goal
+    cost = {start: 0}
+    parents = {start: None}
+    heap = [(abs(start[0] - gx) + abs(start[1] - gy), 0, start)]
+
+    while heap:
+        _, g, node = heapq.heappop(heap)
+        if node == goal:
+            break
+        if g > cost[node]:
+            continue
+
+        x, y = node
+        for dx, dy in _jps_directions(grid, x, y, parents[node]):
+            point = _jump(grid, x, y, dx, dy, goal)
+            if point is None:
+                continue
+            new_cost = g + abs(point[0] - x) + abs(point[1] - y)
+            if new_cost < cost.get(point, new_cost + 1):
+                cost[point] = new_cost
+                parents[point] = node
+                heapq.heappush(heap, (new_cost + abs(point[0] - gx) + abs(point[1] - gy), new_cost, point))
+    else:
+        return None
+
+    # Expand the jump points into every cell along the way
+    points = []
+    node = goal
+    while node is not None:
+        points.append(node)
+        node = parents[node]
+    points.reverse()
+
+    path = [points[0]]
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        dx = (x1 > x0) - (x1 < x0)
+        dy = (y1 > y0) - (y1 < y0)
+        for step in range(1, abs(x1 - x0) + abs(y1 - y0) + 1):
+            path.append((x0 + dx * step, y0 + dy * step))
+    return path
+
+
+def paths_to(grid, goal, starts):
+    """
+    Shortest paths from many starts to one goal with a single breadth-first
+    search out from the goal.
+
+    Args:
+        grid: PathGrid
+        goal: (x, y) cell
+        starts: (x, y) cells
+
+    Returns:
+        list: One path (start to goal inclusive) or None per start
+    """
+    if not grid.is_walkable(*goal):
+        return [None] * len(starts)
+
+    width, height, walkable = grid.width, grid.height, grid.walkable
+    goal_index = goal[1] * width + goal[0]
+    remaining = {s[1] * width + s[0] for s in starts if grid.is_walkable(*s)}
+
+    # Parent links point towards the goal
+    parents = {goal_index: None}
+    queue = deque([goal_index])
+    remaining.discard(goal_index)
+    while queue and remaining:
+        index = queue.popleft()
+        x, y = index % width, index // width
+        for dx, dy in _STEPS:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            neighbour = ny * width + nx
+            if walkable[neighbour] and neighbour not in parents:
+                parents[neighbour] = index
+                remaining.discard(neighbour)
+                queue.append(neighbour)
+
+    paths = []
+    for x, y in starts:
+        index = y * width + x
+        paths.append(_trace(parents, index, width) if grid.is_walkable(x, y) and index in parents else None)
+    return paths
+
+
+class PathFinder(object):
+    """
+    Cached shortest paths on one DungeonLevel.
+
+    Paths are cached per (start, goal). The cache is only touched when the
+    level reports a door change (DungeonLevel.door_changed, called after
+    Player.click_switch): closing a door drops the cached paths through it,
+    opening one drops every cached path since any could now be shorter.
+
+    Attributes:
+        level: The DungeonLevel
+        grid: PathGrid of the level's clipping
+        method: Algorithm for every search, one of METHODS (the cache
+            holds its paths, so it is fixed for the finder's lifetime)
+    """
+
+    def __init__(self, level, method='jps'):
+        """
+        Args:
+            level: DungeonLevel to search (the finder registers for its door changes)
+            method: Algorithm, 'astar' or 'jps'
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown pathfinding method: {method}")
+        self.level = level
+        self.grid = PathGrid(level.clipping)
+        self.method = method
+        self._cache = {}
+        level.add_door_listener(self.door_changed)
+
+    def find(self, start, goal):
+        """
+        Shortest path between two cells.
+
+        Args:
+            start, goal: (x, y) cells
+
+        Returns:
+            list: (x, y) cells from start to goal inclusive, or None if
+            unreachable. The list is shared with the cache; don't modify it.
+        """
+        key = (tuple(start), tuple(goal))
+        if key not in self._cache:
+            search = jps if self.method == 'jps' else astar
+            self._cache[key] = search(self.grid, key[0], key[1])
+        return self._cache[key]
+
+    def find_many(self, queries):
+        """
+        Answer a batch of queries. Uncached queries sharing a goal are
+        answered by one search out from the goal (see paths_to()).
+
+        Args:
+            queries: (start, goal) pairs
+
+        Returns:
+            list: One path or None per query, in order
+        """
+        queries = [(tuple(start), tuple(goal)) for start, goal in queries]
+
+        by_goal = {}
+        for start, goal in queries:
+            if (start, goal) not in self._cache:
+                by_goal.setdefault(goal, []).append(start)
+
+        for goal, starts in by_goal.items():
+            if len(starts) == 1:
+                self.find(starts[0], goal)
+                continue
+            for start, path in zip(starts, paths_to(self.grid, goal, starts)):
+                self._cache[start, goal] = path
+
+        return [self._cache[query] for query in queries]
+
+    def door_changed(self, x, y):
+        """
+        Update the grid after the door at (x, y) opened or closed.
+
+        Args:
+            x, y: Door cell (clipping[y][x])
+        """
+        value = self.level.clipping[y][x]
+        self.grid.set_cell(x, y, value)
+        if value in BLOCKING:
+            cell = (x, y)
+            self._cache = {
+                key: path for key, path in self._cache.items()
+                if path is None or cell not in path
+            }
+        else:
+            self._cache.clear()
+
+    def clear(self):
+        """Drop every cached path."""
+        self._cache.clear()
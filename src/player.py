@@ -1,12 +1,71 @@
+# Movement table: (key, direction) -> (dx, dy, new_direction)
+# 'w'/'s' move forward/back, 'a'/'d' strafe left/right, 'q'/'e' rotate left/right
+MOVES = {
+    ('w', 'N'): (0, -1, 'N'), ('w', 'S'): (0, +1, 'S'), ('w', 'E'): (+1, 0, 'E'), ('w', 'W'): (-1, 0, 'W'),
+    ('s', 'N'): (0, +1, 'N'), ('s', 'S'): (0, -1, 'S'), ('s', 'E'): (-1, 0, 'E'), ('s', 'W'): (+1, 0, 'W'),
+    ('a', 'N'): (-1, 0, 'N'), ('a', 'S'): (+1, 0, 'S'), ('a', 'E'): (0, -1, 'E'), ('a', 'W'): (0, +1, 'W'),
+    ('d', 'N'): (+1, 0, 'N'), ('d', 'S'): (-1, 0, 'S'), ('d', 'E'): (0, +1, 'E'), ('d', 'W'): (0, -1, 'W'),
+    ('q', 'N'): (0, 0, 'W'), ('q', 'S'): (0, 0, 'E'), ('q', 'E'): (0, 0, 'N'), ('q', 'W'): (0, 0, 'S'),
+    ('e', 'N'): (0, 0, 'E'), ('e', 'S'): (0, 0, 'W'), ('e', 'E'): (0, 0, 'S'), ('e', 'W'): (0, 0, 'N'),
+}
+
+# Clipping values the player can't enter (1 = blocked, 3 = closed door)
+BLOCKING = (1, 3)
+
+
+def simulate(clipping, pose, path):
+    """
+    Apply a sequence of moves to a pose without a Player.
+
+    Args:
+        clipping: 2D grid of walkable/blocked cells
+        pose: Starting (x, y, direction)
+        path: Sequence of keys ('w','a','s','d','q','e')
+
+    Returns:
+        tuple: (final (x, y, direction), list of indexes into path that were blocked)
+    """
+    x, y, direction = pose
+    blocked = []
+    moves = MOVES
+
+    for i, key in enumerate(path):
+        dx, dy, new_direction = moves[key, direction]
+        if clipping[y + dy][x + dx] in BLOCKING:
+            blocked.append(i)
+        else:
+            x += dx
+            y += dy
+            direction = new_direction
+
+    return (x, y, direction), blocked
+
+
 class Player(object):
 
-    def __init__(self, dungeon):
+    def __init__(self, dungeon, log=None):
+        """
+        Args:
+            dungeon: The Dungeon the player starts in (at its entry_pos)
+            log: Called with a message on every move and blocked move, e.g.
+                src.log.hook('movement'). None for silence.
+        """
+        self.dungeon = dungeon
         self.level = dungeon.entry_pos[0]
         self.x = dungeon.entry_pos[1]
         self.y = dungeon.entry_pos[2]
         self.direction = dungeon.entry_pos[3]
         self.dungeon_pos = (self.level, self.x, self.y, self.direction)
         self.level_pos = (self.x, self.y, self.direction)
+        self.log = log
+
+    def set_pose(self, x, y, direction):
+        """Place the player at (x, y) facing direction on the current level."""
+        self.x = x
+        self.y = y
+        self.direction = direction
+        self.dungeon_pos = (self.level, x, y, direction)
+        self.level_pos = (x, y, direction)
 
     def move(self, clipping, key):
         """
@@ -18,29 +77,57 @@ class Player(object):
 
         Returns:
             bool: True if the player moved or rotated, False if blocked
+
+        If the level has an occupancy grid (DungeonLevel.occupancy) it is
+        used instead of clipping, so monsters block the way too. Triggers on
+        the level (DungeonLevel.triggers) fire after the move.
         """
-        moves = {
-            'w': {'N': [0, -1, 'N'], 'S': [0, +1, 'S'], 'E': [+1, 0, 'E'], 'W': [-1, 0, 'W']},
-            's': {'N': [0, +1, 'N'], 'S': [0, -1, 'S'], 'E': [-1, 0, 'E'], 'W': [+1, 0, 'W']},
-            'a': {'N': [-1, 0, 'N'], 'S': [+1, 0, 'S'], 'E': [0, -1, 'E'], 'W': [0, +1, 'W']},
-            'd': {'N': [+1, 0, 'N'], 'S': [-1, 0, 'S'], 'E': [0, +1, 'E'], 'W': [0, -1, 'W']},
-            'q': {'N': [0, 0, 'W'], 'S': [0, 0, 'E'], 'E': [0, 0, 'N'], 'W': [0, 0, 'S']},
-            'e': {'N': [0, 0, 'E'], 'S': [0, 0, 'W'], 'E': [0, 0, 'S'], 'W': [0, 0, 'N']}
-        }
-
-        if clipping[self.y + moves[key][self.direction][1]][self.x + moves[key][self.direction][0]] in [1, 3]:
-            print("You can't go that way")
-            return False
+        dx, dy, direction = MOVES[key, self.direction]
+        level = self.dungeon.levels[self.level]
+
+        if level.occupancy is None:
+            blocked = clipping[self.y + dy][self.x + dx] in BLOCKING
         else:
-            self.x += moves[key][self.direction][0]
-            self.y += moves[key][self.direction][1]
-            self.direction = moves[key][self.direction][2]
-            self.dungeon_pos = (self.level, self.x, self.y, self.direction)
-            self.level_pos = (self.x, self.y, self.direction)
-            print(self.dungeon_pos)
-            return True
+            blocked = not level.occupancy.passable(self.x + dx, self.y + dy)
+        if blocked:
+            if self.log is not None:
+                self.log("You can't go that way")
+            return False
+
+        before = self.level_pos
+        self.set_pose(self.x + dx, self.y + dy, direction)
+        if self.log is not None:
+            self.log(self.dungeon_pos)
+
+        if level.triggers is not None:
+            level.triggers.moved(self, before)
+        return True
+
+    def simulate(self, clipping, path):
+        """
+        Apply a sequence of moves in bulk (e.g. a replay or bot plan).
+
+        Nothing is logged and no triggers fire; the player ends at the final pose.
+
+        Args:
+            clipping: 2D grid of walkable/blocked cells
+            path: Sequence of keys ('w','a','s','d','q','e')
+
+        Returns:
+            tuple: (final (x, y, direction), list of indexes into path that were blocked)
+        """
+        pose, blocked = simulate(clipping, self.level_pos, path)
+        self.set_pose(*pose)
+        return pose, blocked
 
     def click_switch(self, switches, adornments, clipping):
+        """
+        Throw the switch the player is facing, if any.
+
+        Returns:
+            tuple: (x, y) of the door cell that opened or closed, or None if
+            there is no switch here (pass it to DungeonLevel.door_changed)
+        """
         if self.dungeon_pos in switches.keys():
             x = switches[self.dungeon_pos][0][0]
             y = switches[self.dungeon_pos][0][1]
@@ -50,3 +137,5 @@ class Player(object):
             else:
                 clipping[x][y] = 3
                 adornments[switches[self.dungeon_pos][1]] = 'LeverUp'
+            return y, x
+        return None
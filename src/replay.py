@@ -0,0 +1,306 @@
+"""
+Deterministic input recording and headless replay.
+
+A recording holds the dungeon's initial state (player pose plus every level's
+clipping and adornments) and every gameplay key press with the simulation
+tick it happened on. A quickload (F9) replaces the state with one from a
+save file the replay doesn't have, so the state after each quickload is
+recorded too. Replaying feeds the same keys to Player/DungeonView
+without a window, either as fast as possible or at the recorded pace, and
+times each phase.
+
+File format (little-endian):
+    b'POBR', version (u16), header length (u32), zlib-compressed JSON header,
+    then one (tick u32, key u8) record per event. Keys index into KEYS. The
+    header's 'loads' maps event numbers of successful quickloads to the
+    snapshot() after them (version 2; version 1 files have no quickloads).
+"""
+import importlib
+import json
+import struct
+import time
+import zlib
+
+import pygame as pg
+
+from .dungeon_tileset import VIEWPORT_RECT
+from .dungeon_view import DungeonView
+from .env import init_headless
+from .game import Game, SIM_RATE
+from .player import Player
+
+
+MAGIC = b'POBR'
+VERSION = 2
+
+# Recorded keys, indexed by key code
+KEYS = ('w', 's', 'a', 'd', 'q', 'e', 'space', 'f5', 'f9')
+
+_PREAMBLE = struct.Struct('<4sHI')
+_EVENT = struct.Struct('<IB')
+
+
+def snapshot(dungeon, pose):
+    """
+    Capture the mutable state of a dungeon.
+
+    Args:
+        dungeon: The Dungeon
+        pose: Player (level, x, y, direction)
+
+    Returns:
+        dict: JSON-serializable state (see restore())
+    """
+    return {
+        'pose': list(pose),
+        'levels': [
+            {
+                'clipping': [list(row) for row in level.clipping],
+                'adornments': [[*key, name] for key, name in level.adornments.items()],
+            }
+            for level in dungeon.levels
+        ],
+    }
+
+
+def restore(dungeon, state):
+    """
+    Apply a snapshot() to a dungeon in place.
+
+    Only cells and adornments that differ are changed. Each changed cell is
+    passed to DungeonLevel.door_changed, so path caches, distance fields
+    and occupancy grids (and the level's LevelChanges, if tracking) see it.
+
+    Returns:
+        tuple: The recorded player (level, x, y, direction)
+    """
+    for level, saved in zip(dungeon.levels, state['levels']):
+        changed = []
+        for y, row in enumerate(saved['clipping']):
+            for x, value in enumerate(row):
+                if level.clipping[y][x] != value:
+                    level.clipping[y][x] = value
+                    changed.append((x, y))
+
+        adornments = {(a, x, y): name for a, x, y, name in saved['adornments']}
+        for key in set(level.adornments) | set(adornments):
+            if level.adornments.get(key) != adornments.get(key):
+                if key in adornments:
+                    level.adornments[key] = adornments[key]
+                else:
+                    del level.adornments[key]
+                if level.changes is not None:
+                    level.changes.mark_adornment(key)
+
+        for x, y in changed:
+            if level.changes is not None:
+                level.changes.mark_cell(x, y)
+            level.door_changed(x, y)
+    return tuple(state['pose'])
+
+
+class InputRecorder(object):
+    """
+    Records gameplay key presses to a file.
+
+    Events are buffered in memory and written by close(), so recording adds
+    no file I/O to the input path.
+    """
+
+    def __init__(self, path, dungeon, pose, dungeon_module='levels.sewer'):
+        """
+        Args:
+            path: File to write
+            dungeon: The Dungeon, in its initial state
+            pose: Player (level, x, y, direction) at the start
+            dungeon_module: Module the dungeon is imported from (replays import it)
+        """
+        self.path = path
+        self.header = {
+            'dungeon': dungeon_module,
+            'sim_rate': SIM_RATE,
+            'state': snapshot(dungeon, pose),
+            'loads': {},
+        }
+        self._events = bytearray()
+
+    def record(self, tick, key):
+        """
+        Record a key press. Keys not in KEYS are ignored.
+
+        Args:
+            tick: Simulation tick the key was pressed on
+            key: Key name ('w', 'space', 'f5', ...)
+        """
+        if key in KEYS:
+            self._events += _EVENT.pack(tick, KEYS.index(key))
+
+    def loaded(self, dungeon, pose):
+        """
+        Record the state a quickload just put the game in (call after
+        record() of its 'f9' key, and only if the load succeeded).
+
+        Args:
+            dungeon: The Dungeon, as loaded
+            pose: Player (level, x, y, direction) after loading
+        """
+        event = len(self._events) // _EVENT.size - 1
+        self.header['loads'][str(event)] = snapshot(dungeon, pose)
+
+    def close(self):
+        """Write the recording to disk."""
+        header = zlib.compress(json.dumps(self.header, separators=(',', ':')).encode())
+        with open(self.path, 'wb') as f:
+            f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+            f.write(header)
+            f.write(self._events)
+
+
+def load_recording(path):
+    """
+    Read a recording.
+
+    Returns:
+        tuple: (header dict, list of (tick, key) events)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    magic, version, header_length = _PREAMBLE.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a recording")
+    if version not in (1, VERSION):
+        raise ValueError(f"Unsupported recording version {version}")
+
+    start = _PREAMBLE.size
+    header = json.loads(zlib.decompress(data[start:start + header_length]))
+    events = [
+        (tick, KEYS[code])
+        for tick, code in _EVENT.iter_unpack(data[start + header_length:])
+    ]
+    return header, events
+
+
+class ReplayRunner(object):
+    """
+    Replays a recording headlessly and times each phase.
+
+    Phases: 'move' (Player.move), 'switch' (Player.click_switch),
+    'update_panels', 'reload' (tileset hot reload), 'load' (quickload, the
+    recorded state restored) and 'render'.
+
+    Attributes:
+        dungeon: The replayed Dungeon
+        player: The replayed Player
+        timings (dict): Phase -> list of durations in seconds
+    """
+
+    def __init__(self, path, render=True, realtime=False):
+        """
+        Args:
+            path: Recording file
+            render: Render the viewport after every change (needs images)
+            realtime: Keep the recorded pace instead of running flat out
+        """
+        self.header, self.events = load_recording(path)
+        self.render = render
+        self.realtime = realtime
+
+        self.dungeon = importlib.import_module(self.header['dungeon']).dungeon
+        level, x, y, direction = restore(self.dungeon, self.header['state'])
+
+        self.player = Player(self.dungeon)
+        self.player.level = level
+        self.player.set_pose(x, y, direction)
+
+        if render:
+            init_headless()
+            self.surface = pg.Surface(VIEWPORT_RECT.size).convert()
+
+        self.game = Game(self.player)
+        self._new_view()
+        self.timings = {phase: [] for phase in ('move', 'switch', 'update_panels', 'reload', 'load', 'render')}
+
+    @property
+    def level(self):
+        return self.dungeon.levels[self.player.level]
+
+    def _new_view(self):
+        self.dungeon_view = DungeonView(self.level.environment, load_images=self.render)
+        self.game.dungeon_view_init(self.dungeon_view)
+
+    def _load(self, state):
+        level, x, y, direction = restore(self.dungeon, state)
+        self.player.level = level
+        self.player.set_pose(x, y, direction)
+
+    def _timed(self, phase, func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.timings[phase].append(time.perf_counter() - start)
+        return result
+
+    def _update_panels(self, swap_background=True):
+        level = self.level
+        self._timed(
+            'update_panels', self.dungeon_view.update_panels,
+            self.player.level_pos, level.walls_x, level.walls_y,
+            level.adornments, level.clipping, swap_background=swap_background
+        )
+
+    def run(self):
+        """
+        Replay every event.
+
+        Returns:
+            dict: Phase -> (count, total seconds, mean seconds)
+        """
+        self._update_panels()
+        if self.render:
+            self._timed('render', self.game.render_view, self.surface)
+
+        timestep = 1.0 / self.header['sim_rate']
+        start = time.perf_counter()
+
+        loads = self.header.get('loads', {})
+        for number, (tick, key) in enumerate(self.events):
+            if self.realtime:
+                delay = tick * timestep - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+
+            level = self.level
+            if key == 'space':
+                door = self._timed('switch', self.player.click_switch,
+                                   level.switches, level.adornments, level.clipping)
+                if door is not None:
+                    level.door_changed(*door)
+                self._update_panels(swap_background=False)
+            elif key == 'f5':
+                self._timed('reload', self._new_view)
+                self._update_panels()
+            elif key == 'f9':
+                # Failed quickloads changed nothing and have no state
+                if str(number) not in loads:
+                    continue
+                self._timed('load', self._load, loads[str(number)])
+                self._update_panels()
+            elif self._timed('move', self.player.move, level.clipping, key):
+                self._update_panels()
+            else:
+                continue
+
+            if self.render:
+                self._timed('render', self.game.render_view, self.surface)
+
+        return self.summary()
+
+    def summary(self):
+        """
+        Returns:
+            dict: Phase -> (count, total seconds, mean seconds) for phases that ran
+        """
+        return {
+            phase: (len(times), sum(times), sum(times) / len(times))
+            for phase, times in self.timings.items() if times
+        }
@@ -0,0 +1,221 @@
+"""
+Route planning over door states.
+
+Which cells the party can reach depends on which lever-controlled doors are
+open. RoutePlanner searches over (area, door mask) states, where the door
+mask has one bit per door in the level's `switches` table (set = open) and
+an area is a set of cells connected with the doors in that mask. Areas are
+worked out once per mask and memoized, so a search only floods the level
+once for every door state it visits.
+
+Example:
+    planner = RoutePlanner(level)
+    planner.plan((7, 13), (16, 22))     # switch keys to pull in order, or None
+    planner.route((7, 13), (16, 22))    # [('walk', cells), ('pull', key), ...]
+"""
+from collections import deque
+
+from .pathfinding import PathGrid, astar
+from .player import BLOCKING
+
+
+class RoutePlanner(object):
+    """
+    Plans which levers to pull to get from one cell to another.
+
+    The planner reads the level's switches and the static part of its
+    clipping grid when it's created; door cells are taken from the mask, so
+    it stays valid while doors open and close (plans start from the doors
+    as they are in level.clipping at the time of the call).
+
+    Attributes:
+        level: The DungeonLevel
+        doors: Door cells (x, y); door i is bit i of a mask
+        levers: Switch key (level, x, y, direction) -> door bit
+    """
+
+    def __init__(self, level):
+        """
+        Args:
+            level: DungeonLevel to plan on
+        """
+        self.level = level
+        self.doors = sorted({(door_x, door_y) for (door_y, door_x), _ in level.switches.values()})
+        bits = {door: i for i, door in enumerate(self.doors)}
+        self.levers = {
+            key: bits[door_x, door_y]
+            for key, ((door_y, door_x), _) in level.switches.items()
+        }
+
+        # Doors closed; masks open them
+        self._base = PathGrid(level.clipping)
+        for x, y in self.doors:
+            self._base.set_cell(x, y, 3)
+        self._areas = {}
+
+    def door_mask(self):
+        """Mask of the doors currently open in level.clipping."""
+        mask = 0
+        for i, (x, y) in enumerate(self.doors):
+            if self.level.clipping[y][x] not in BLOCKING:
+                mask |= 1 << i
+        return mask
+
+    def grid(self, mask):
+        """PathGrid of the level with the doors in mask open."""
+        grid = self._base.copy()
+        for i, (x, y) in enumerate(self.doors):
+            if mask >> i & 1:
+                grid.set_cell(x, y, 2)
+        return grid
+
+    def areas(self, mask):
+        """
+        Connected areas with the doors in mask open (memoized per mask).
+
+        Returns:
+            dict: (x, y) -> area number, for every walkable cell
+        """
+        if mask in self._areas:
+            return self._areas[mask]
+
+        grid = self.grid(mask)
+        areas = {}
+        area = -1
+        for y in range(grid.height):
+            for x in range(grid.width):
+                if (x, y) in areas or not grid.is_walkable(x, y):
+                    continue
+                area += 1
+                areas[x, y] = area
+                queue = deque([(x, y)])
+                while queue:
+                    cx, cy = queue.popleft()
+                    for nx, ny in ((cx, cy - 1), (cx + 1, cy), (cx, cy + 1), (cx - 1, cy)):
+                        if (nx, ny) not in areas and grid.is_walkable(nx, ny):
+                            areas[nx, ny] = area
+                            queue.append((nx, ny))
+
+        self._areas[mask] = areas
+        return areas
+
+    def _areas_around(self, cell, mask):
+        """
+        States the party can be in standing on cell after a pull.
+
+        Normally just the cell's area. If the lever closed a door on the cell
+        the party stands on, the party can still step off it to either side.
+        """
+        areas = self.areas(mask)
+        if cell in areas:
+            return [(areas[cell], mask)]
+        x, y = cell
+        around = {areas.get(neighbour) for neighbour in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y))}
+        return [(area, mask) for area in sorted(around - {None})]
+
+    def _search(self, start, goal=None, mask=None):
+        """
+        Breadth-first search over (area, mask) states, fewest lever pulls first.
+
+        Returns:
+            tuple: (parents, found) where parents maps each state reached to
+            (previous state, switch key) and found is the first state whose
+            area holds goal (None if no goal given or it can't be reached)
+        """
+        if mask is None:
+            mask = self.door_mask()
+        area = self.areas(mask).get(tuple(start))
+        if area is None:
+            return {}, None
+
+        state = (area, mask)
+        parents = {state: None}
+        queue = deque([state])
+        while queue:
+            area, mask = state = queue.popleft()
+            areas = self.areas(mask)
+            if goal is not None and areas.get(tuple(goal)) == area:
+                return parents, state
+
+            for key, bit in self.levers.items():
+                lever = (key[1], key[2])
+                if areas.get(lever) != area:
+                    continue
+                pulled = mask ^ (1 << bit)
+                for following in self._areas_around(lever, pulled):
+                    if following not in parents:
+                        parents[following] = (state, key)
+                        queue.append(following)
+
+        return parents, None
+
+    def plan(self, start, goal, mask=None):
+        """
+        Levers to pull, in order, to walk from start to goal.
+
+        Args:
+            start, goal: (x, y) cells
+            mask: Door mask to start from (default: the doors as they are)
+
+        Returns:
+            list: Switch keys (level, x, y, direction), empty if goal can be
+            walked to already, or None if no combination of levers reaches it
+        """
+        parents, found = self._search(start, goal, mask)
+        if found is None:
+            return None
+
+        keys = []
+        while parents[found] is not None:
+            found, key = parents[found]
+            keys.append(key)
+        keys.reverse()
+        return keys
+
+    def route(self, start, goal, mask=None):
+        """
+        Full route from start to goal: walks between the levers and pulls.
+
+        Returns:
+            list: ('walk', [(x, y), ...]) and ('pull', switch key) steps, or
+            None if the goal can't be reached
+        """
+        if mask is None:
+            mask = self.door_mask()
+        keys = self.plan(start, goal, mask)
+        if keys is None:
+            return None
+
+        steps = []
+        position = tuple(start)
+        for key in keys + [None]:
+            target = (key[1], key[2]) if key is not None else tuple(goal)
+            if target != position:
+                # The party may be standing on a door it just closed
+                grid = self.grid(mask)
+                grid.set_cell(*position, 0)
+                steps.append(('walk', astar(grid, position, target)))
+                position = target
+            if key is not None:
+                steps.append(('pull', key))
+                mask ^= 1 << self.levers[key]
+        return steps
+
+    def reachable(self, start, mask=None):
+        """
+        Every cell the party can get to from start with some combination of
+        lever pulls (for level validation).
+
+        Returns:
+            set: (x, y) cells
+        """
+        parents, _ = self._search(start, mask=mask)
+        cells = set()
+        for area, mask in parents:
+            cells.update(cell for cell, number in self.areas(mask).items() if number == area)
+        return cells
+
+    def reachable_masks(self, start, mask=None):
+        """Door masks the party can put the level in from start."""
+        parents, _ = self._search(start, mask=mask)
+        return {mask for _, mask in parents}
@@ -0,0 +1,347 @@
+"""
+Binary save games as deltas against the static levels.
+
+The levels themselves ship with the game (levels/*.py), so a save doesn't
+repeat them. It identifies each level by a hash of its content as loaded
+and stores only what changed since: clipping cells (doors) and adornments
+(levers) that differ, the party's pose and the EntityStore's live rows.
+
+Changes are tracked as they happen. track(dungeon), called right after
+the dungeon is loaded, gives each DungeonLevel a LevelChanges that keeps a
+copy of the level as loaded and listens for door changes
+(DungeonLevel.door_changed), so saving looks only at the cells and
+adornments that were touched and loading only reverts and applies those.
+Save and load time grow with the changes, not the dungeon.
+
+File format (little-endian):
+    b'POBS', version (u16), then a zlib-compressed body:
+    dungeon module (u16 length + UTF-8), pose (level u16, x i16, y i16,
+    direction u8 index into DIRECTIONS), level count (u16), per level:
+    content hash (16 bytes), cell count (u32) and (x i16, y i16, value u8)
+    per changed cell, adornment count (u32) and (axis u8, x i16, y i16,
+    name u8 length + UTF-8, length 0 = removed) per changed adornment;
+    entity count (u32), and if any: column count (u8), per column its name
+    and NumPy dtype (u8 length + ASCII each), the entity ids (i4) and
+    each column's values.
+"""
+import hashlib
+import json
+import struct
+import zlib
+
+import numpy as np
+
+
+MAGIC = b'POBS'
+VERSION = 1
+
+# Player directions, indexed by code
+DIRECTIONS = ('N', 'E', 'S', 'W')
+
+_PREAMBLE = struct.Struct('<4sH')
+_POSE = struct.Struct('<HhhB')
+_CELL = struct.Struct('<hhB')
+_ADORNMENT = struct.Struct('<chhB')
+_U8 = struct.Struct('<B')
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+
+
+class LevelChanges(object):
+    """
+    Tracks which parts of a DungeonLevel changed since it was loaded.
+
+    Created by DungeonLevel.change_tracker() (see track()). Door changes
+    reported through DungeonLevel.door_changed mark the door cell and the
+    lever adornments of every switch for that door; anything else that
+    changes clipping or adornments should call mark_cell() /
+    mark_adornment().
+
+    Attributes:
+        level: The DungeonLevel
+        cells: (x, y) clipping cells touched since loading
+        adornments: Adornment keys (axis, x, y) touched since loading
+    """
+
+    def __init__(self, level):
+        self.level = level
+        self.cells = set()
+        self.adornments = set()
+        self._clipping = [list(row) for row in level.clipping]
+        self._adornments = dict(level.adornments)
+        self._hash = None
+
+        self._levers = {}
+        for (door_y, door_x), lever in level.switches.values():
+            self._levers.setdefault((door_x, door_y), []).append(tuple(lever))
+
+        level.add_door_listener(self.door_changed)
+
+    def door_changed(self, x, y):
+        """Mark a door cell and its levers (a DungeonLevel door listener)."""
+        self.cells.add((x, y))
+        self.adornments.update(self._levers.get((x, y), ()))
+
+    def mark_cell(self, x, y):
+        """Mark a clipping cell as possibly changed."""
+        self.cells.add((x, y))
+
+    def mark_adornment(self, key):
+        """Mark an adornment (axis, x, y) as possibly changed."""
+        self.adornments.add(tuple(key))
+
+    def base_hash(self):
+        """
+        Hash of the level as loaded (walls, clipping, adornments, switches).
+
+        Returns:
+            bytes: 16-byte digest, worked out once
+        """
+        if self._hash is None:
+            level = self.level
+            content = json.dumps([
+                level.environment, level.walls_x, level.walls_y, self._clipping,
+                sorted([*key, name] for key, name in self._adornments.items()),
+                sorted([list(key), [list(door), list(lever)]] for key, (door, lever) in level.switches.items()),
+            ], separators=(',', ':'), default=str)
+            self._hash = hashlib.blake2b(content.encode(), digest_size=16).digest()
+        return self._hash
+
+    def delta(self):
+        """
+        What differs from the level as loaded, among the touched cells.
+
+        Returns:
+            tuple: ([(x, y, value)], [((axis, x, y), name or None)]) sorted
+        """
+        clipping, adornments = self.level.clipping, self.level.adornments
+        cells = [
+            (x, y, clipping[y][x]) for x, y in sorted(self.cells)
+            if clipping[y][x] != self._clipping[y][x]
+        ]
+        changed = [
+            (key, adornments.get(key)) for key in sorted(self.adornments)
+            if adornments.get(key) != self._adornments.get(key)
+        ]
+        return cells, changed
+
+    def revert(self):
+        """
+        Put every touched cell and adornment back as loaded.
+
+        Returns:
+            list: (x, y) cells whose clipping value changed
+        """
+        reverted = []
+        for x, y in self.cells:
+            if self.level.clipping[y][x] != self._clipping[y][x]:
+                self.level.clipping[y][x] = self._clipping[y][x]
+                reverted.append((x, y))
+        for key in self.adornments:
+            if key in self._adornments:
+                self.level.adornments[key] = self._adornments[key]
+            else:
+                self.level.adornments.pop(key, None)
+        self.cells.clear()
+        self.adornments.clear()
+        return reverted
+
+
+def track(dungeon):
+    """
+    Start tracking changes on every level of a freshly loaded dungeon.
+
+    The levels as they are now are the base saves are made against, so call
+    this before anything changes (a level left untracked until the first
+    save would take its changed state as the base, and the save couldn't be
+    loaded into a fresh copy of the dungeon).
+    """
+    for level in dungeon.levels:
+        level.change_tracker()
+
+
+def _pack_str(text, length=_U8):
+    data = text.encode()
+    return length.pack(len(data)) + data
+
+
+def _unpack_str(data, offset, length=_U8):
+    (size,) = length.unpack_from(data, offset)
+    offset += length.size
+    return data[offset:offset + size].decode(), offset + size
+
+
+def save_game(path, dungeon, player, store=None, dungeon_module='levels.sewer'):
+    """
+    Write a save game.
+
+    Args:
+        path: File to write
+        dungeon: The Dungeon
+        player: The Player
+        store: EntityStore to save, if any
+        dungeon_module: Module the dungeon is imported from
+    """
+    body = bytearray(_pack_str(dungeon_module, _U16))
+    body += _POSE.pack(player.level, player.x, player.y, DIRECTIONS.index(player.direction))
+
+    body += _U16.pack(len(dungeon.levels))
+    for level in dungeon.levels:
+        changes = level.change_tracker()
+        cells, adornments = changes.delta()
+        body += changes.base_hash()
+        body += _U32.pack(len(cells))
+        for cell in cells:
+            body += _CELL.pack(*cell)
+        body += _U32.pack(len(adornments))
+        for (axis, x, y), name in adornments:
+            body += _ADORNMENT.pack(axis.encode(), x, y, 0) if name is None else \
+                _ADORNMENT.pack(axis.encode(), x, y, len(name.encode())) + name.encode()
+
+    ids, columns = store.rows() if store is not None else ([], {})
+    body += _U32.pack(len(ids))
+    if len(ids):
+        body += _U8.pack(len(columns))
+        for name, values in columns.items():
+            body += _pack_str(name) + _pack_str(values.dtype.str)
+        body += np.asarray(ids, dtype='<i4').tobytes()
+        for values in columns.values():
+            body += values.tobytes()
+
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION))
+        f.write(zlib.compress(bytes(body)))
+
+
+def _parse(data):
+    """Decode a decompressed save body (raises struct.error if it's cut short)."""
+    module, offset = _unpack_str(data, 0, _U16)
+    pose = _POSE.unpack_from(data, offset)
+    offset += _POSE.size
+
+    (count,) = _U16.unpack_from(data, offset)
+    offset += _U16.size
+    levels = []
+    for _ in range(count):
+        digest = data[offset:offset + 16]
+        if len(digest) != 16:
+            raise struct.error("level hash cut short")
+        offset += 16
+
+        (cells,) = _U32.unpack_from(data, offset)
+        offset += _U32.size
+        changed = list(_CELL.iter_unpack(data[offset:offset + cells * _CELL.size]))
+        if len(changed) != cells:
+            raise struct.error("cells cut short")
+        offset += cells * _CELL.size
+
+        (count_adornments,) = _U32.unpack_from(data, offset)
+        offset += _U32.size
+        adornments = []
+        for _ in range(count_adornments):
+            axis, x, y, size = _ADORNMENT.unpack_from(data, offset)
+            offset += _ADORNMENT.size
+            name = data[offset:offset + size]
+            if len(name) != size:
+                raise struct.error("adornment name cut short")
+            adornments.append(((axis.decode(), x, y), name.decode() if size else None))
+            offset += size
+        levels.append((digest, changed, adornments))
+
+    (entities,) = _U32.unpack_from(data, offset)
+    offset += _U32.size
+    ids, columns = np.zeros(0, dtype=np.int32), {}
+    if entities:
+        (names,) = _U8.unpack_from(data, offset)
+        offset += _U8.size
+        dtypes = []
+        for _ in range(names):
+            name, offset = _unpack_str(data, offset)
+            dtype, offset = _unpack_str(data, offset)
+            dtypes.append((name, np.dtype(dtype)))
+        if offset + entities * (4 + sum(dtype.itemsize for _, dtype in dtypes)) > len(data):
+            raise struct.error("entity columns cut short")
+        ids = np.frombuffer(data, dtype='<i4', count=entities, offset=offset)
+        offset += ids.nbytes
+        for name, dtype in dtypes:
+            columns[name] = np.frombuffer(data, dtype=dtype, count=entities, offset=offset)
+            offset += columns[name].nbytes
+    return module, pose, levels, ids, columns
+
+
+def load_game(path, dungeon, player, store=None):
+    """
+    Load a save game into a running dungeon.
+
+    The dungeon's levels must be the ones the save was made from (same
+    content hashes). The whole file is read and checked before anything
+    changes; then touched cells are reverted, the save's changes applied
+    and door listeners told about every door that ends up different.
+
+    Args:
+        path: File to read
+        dungeon: The Dungeon (in any state)
+        player: The Player, moved to the saved pose
+        store: EntityStore to replace the contents of, if any
+
+    Returns:
+        dict: 'dungeon' (module name), 'pose' (level, x, y, direction) and
+        'entities' (number loaded)
+
+    Raises:
+        ValueError: Not a save game, a damaged one, another version or made
+            from different levels (the dungeon is left unchanged)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if data[:len(MAGIC)] != MAGIC or len(data) < _PREAMBLE.size:
+        raise ValueError(f"{path} is not a save game")
+    _, version = _PREAMBLE.unpack_from(data)
+    if version != VERSION:
+        raise ValueError(f"Unsupported save game version {version}")
+    try:
+        module, pose, levels, ids, columns = _parse(zlib.decompress(data[_PREAMBLE.size:]))
+        level_index, x, y, direction = pose
+        direction = DIRECTIONS[direction]
+    except (zlib.error, struct.error, UnicodeDecodeError, TypeError, IndexError) as error:
+        raise ValueError(f"{path} is not a valid save game ({error})") from error
+
+    if len(levels) != len(dungeon.levels):
+        raise ValueError(f"Save has {len(levels)} levels, the dungeon {len(dungeon.levels)}")
+    for number, (level, (digest, cells, _)) in enumerate(zip(dungeon.levels, levels)):
+        if digest != level.change_tracker().base_hash():
+            raise ValueError(f"Level {number} differs from the one the game was saved with")
+        height, width = len(level.clipping), len(level.clipping[0])
+        if not all(0 <= cx < width and 0 <= cy < height for cx, cy, _ in cells):
+            raise ValueError(f"{path} is not a valid save game (cell outside level {number})")
+    if ids.size and (ids.min() < 0 or len(np.unique(ids)) != len(ids)):
+        raise ValueError(f"{path} is not a valid save game (bad entity ids)")
+
+    for level, (_, cells, adornments) in zip(dungeon.levels, levels):
+        changes = level.change_tracker()
+        # Clipping of the touched cells before loading, to tell which doors end up different
+        before = {(cx, cy): level.clipping[cy][cx] for cx, cy in changes.cells}
+        changes.revert()
+        for cx, cy, value in cells:
+            before.setdefault((cx, cy), level.clipping[cy][cx])
+            level.clipping[cy][cx] = value
+            changes.mark_cell(cx, cy)
+
+        for key, name in adornments:
+            if name is None:
+                level.adornments.pop(key, None)
+            else:
+                level.adornments[key] = name
+            changes.mark_adornment(key)
+
+        for (cx, cy), value in sorted(before.items()):
+            if level.clipping[cy][cx] != value:
+                level.door_changed(cx, cy)
+
+    if store is not None:
+        store.load_rows(ids, columns)
+
+    player.level = level_index
+    player.set_pose(x, y, direction)
+    return {'dungeon': module, 'pose': (level_index, x, y, direction), 'entities': len(ids)}
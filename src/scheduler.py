@@ -0,0 +1,196 @@
+"""
+Event scheduler for real-time game events.
+
+Monster moves, spell durations, door animations and the like are scheduled
+as events that fire after a delay, once or periodically. Game.update()
+advances the scheduler by one simulation step per GameClock step, so events
+run at the simulation rate and are timed in whole steps.
+
+Events belong to a level (or to no level, for global events such as spell
+durations on the party). Each level has its own binary heap and its own
+time, which stands still while the level is paused, so a paused level's
+events are simply delayed by the pause. A step costs one heap peek per
+running level plus the events that fire, however many are pending.
+
+Example:
+    scheduler = game.scheduler
+    monsters = scheduler.every(scheduler.timestep, manager.step, level=0)  # SimulationManager
+    scheduler.schedule(2.0, game.invalidate)
+    monsters.cancel()
+    scheduler.pause(0)
+"""
+import heapq
+import itertools
+import math
+
+
+class Event(object):
+    """
+    A scheduled callback.
+
+    Attributes:
+        time: Step (in its level's time) the event fires at next
+        callback, args: Called as callback(*args)
+        interval: Steps between firings of a periodic event, None for one-off
+        level: Level index, None for global events
+        cancelled (bool): True once cancelled
+    """
+
+    __slots__ = ('time', 'callback', 'args', 'interval', 'level', 'cancelled', '_scheduler')
+
+    def __init__(self, scheduler, time, callback, args, interval, level):
+        self._scheduler = scheduler
+        self.time = time
+        self.callback = callback
+        self.args = args
+        self.interval = interval
+        self.level = level
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop the event from firing (again)."""
+        self._scheduler.cancel(self)
+
+
+class _Timeline(object):
+    """The pending events and time of one level."""
+
+    __slots__ = ('now', 'heap', 'paused')
+
+    def __init__(self):
+        self.now = 0
+        self.heap = []
+        self.paused = False
+
+
+class Scheduler(object):
+    """
+    Fires events after delays measured in simulation steps.
+
+    Attributes:
+        timestep (float): Seconds per step (delays in seconds are rounded up
+            to whole steps, at least one)
+        ticks (int): Steps run so far
+    """
+
+    def __init__(self, timestep):
+        """
+        Args:
+            timestep: Simulation timestep in seconds (GameClock.timestep)
+        """
+        self.timestep = timestep
+        self.ticks = 0
+        self._timelines = {None: _Timeline()}
+        self._order = itertools.count()
+        self._pending = 0
+
+    def __len__(self):
+        """Number of events waiting to fire (not counting cancelled ones)."""
+        return self._pending
+
+    def _steps(self, seconds):
+        # Small tolerance so e.g. 0.25s at 60 steps/s is 15 steps, not 16
+        return max(1, math.ceil(seconds / self.timestep - 1e-9))
+
+    def _timeline(self, level):
+        timeline = self._timelines.get(level)
+        if timeline is None:
+            timeline = self._timelines[level] = _Timeline()
+        return timeline
+
+    def _push(self, timeline, event):
+        heapq.heappush(timeline.heap, (event.time, next(self._order), event))
+
+    def schedule(self, delay, callback, *args, level=None):
+        """
+        Fire callback(*args) once after delay seconds.
+
+        Args:
+            delay: Seconds from now (in the level's time)
+            callback: Function to call
+            args: Its arguments
+            level: Level index the event belongs to (paused with it), or None
+
+        Returns:
+            Event: For cancelling
+        """
+        timeline = self._timeline(level)
+        event = Event(self, timeline.now + self._steps(delay), callback, args, None, level)
+        self._push(timeline, event)
+        self._pending += 1
+        return event
+
+    def every(self, interval, callback, *args, level=None, delay=None):
+        """
+        Fire callback(*args) every interval seconds until cancelled.
+
+        Args:
+            interval: Seconds between firings
+            callback: Function to call
+            args: Its arguments
+            level: Level index the event belongs to (paused with it), or None
+            delay: Seconds to the first firing (default: interval)
+
+        Returns:
+            Event: For cancelling
+        """
+        timeline = self._timeline(level)
+        first = self._steps(interval if delay is None else delay)
+        event = Event(self, timeline.now + first, callback, args, self._steps(interval), level)
+        self._push(timeline, event)
+        self._pending += 1
+        return event
+
+    def cancel(self, event):
+        """Cancel an event (does nothing if it already fired or was cancelled)."""
+        if not event.cancelled and event.time is not None:
+            event.cancelled = True
+            self._pending -= 1
+
+    def pause(self, level):
+        """Stop a level's time: its events wait until resume()."""
+        self._timeline(level).paused = True
+
+    def resume(self, level):
+        """Restart a paused level's time."""
+        self._timeline(level).paused = False
+
+    def is_paused(self, level):
+        """Return True if the level is paused."""
+        return level in self._timelines and self._timelines[level].paused
+
+    def time(self, level=None):
+        """Steps a level's time has advanced (excluding pauses)."""
+        return self._timeline(level).now
+
+    def tick(self):
+        """
+        Advance every running level by one step and fire the events due.
+
+        Events due at the same step fire in the order they were scheduled.
+
+        Returns:
+            int: Number of events fired
+        """
+        self.ticks += 1
+        fired = 0
+        for timeline in list(self._timelines.values()):
+            if timeline.paused:
+                continue
+            timeline.now += 1
+            heap = timeline.heap
+            while heap and heap[0][0] <= timeline.now:
+                _, _, event = heapq.heappop(heap)
+                if event.cancelled:
+                    continue
+
+                if event.interval is None:
+                    event.time = None
+                    self._pending -= 1
+                event.callback(*event.args)
+                fired += 1
+
+                if event.interval is not None and not event.cancelled:
+                    event.time += event.interval
+                    self._push(timeline, event)
+        return fired
@@ -0,0 +1,119 @@
+"""
+Level-of-detail simulation of EntityStore monsters.
+
+Simulating every monster on every level each step is wasted work when the
+party can only meet the ones nearby. SimulationManager splits the monsters
+by walking distance to the party (the level's DistanceField):
+
+- near (up to `near` steps away): simulated every step
+- mid (up to `far` steps away): simulated every `mid_interval` steps,
+  staggered by entity id, with the whole elapsed time in one call
+- far, unreachable or on another level: frozen
+
+A frozen monster that comes back into range is first caught up with the
+`advance` callback over the time it missed, then simulated as usual. The
+catch-up depends only on the number of steps missed, so a monster ends up
+in the same state whenever the party arrives.
+
+Example:
+    manager = SimulationManager(store, player, think=monster_ai)
+    game.scheduler.every(game.scheduler.timestep, manager.step)
+"""
+import numpy as np
+
+from .distance_field import UNREACHABLE
+from .entities import NONE
+
+
+# Default band limits (walking steps from the party) and mid-range rate
+NEAR = 4
+FAR = 12
+MID_INTERVAL = 4
+
+
+def advance_timers(store, ids, elapsed):
+    """
+    Default catch-up: count the missed time off the entities' timers.
+
+    Args:
+        store: The EntityStore
+        ids: Entity ids
+        elapsed: Seconds missed per entity (array)
+    """
+    store.timer[ids] = np.maximum(store.timer[ids] - elapsed, 0.0)
+
+
+class SimulationManager(object):
+    """
+    Runs monster AI at a rate that depends on distance to the party.
+
+    Attributes:
+        store: EntityStore of the monsters
+        player: The Player (its level and cell give the party's position)
+        think: Called as think(store, ids, dt) with the entities due this
+            step and the seconds each one advances (array)
+        advance: Called as advance(store, ids, elapsed) to catch frozen
+            entities up by elapsed seconds (array) before they think again
+        timestep: Seconds per simulation step
+        near, far: Band limits in walking steps
+        mid_interval: Steps between updates of mid-range entities
+        ticks (int): Steps run so far
+    """
+
+    def __init__(self, store, player, think, advance=advance_timers, timestep=1.0 / 60,
+                 near=NEAR, far=FAR, mid_interval=MID_INTERVAL):
+        self.store = store
+        self.player = player
+        self.think = think
+        self.advance = advance
+        self.timestep = timestep
+        self.near = near
+        self.far = far
+        self.mid_interval = mid_interval
+        self.ticks = 0
+
+    def bands(self):
+        """
+        Split the entities on the party's level by distance.
+
+        Returns:
+            tuple: (near ids, mid ids) arrays; every other entity is frozen
+        """
+        store, player = self.store, self.player
+        field = store.levels[player.level].distance_field()
+        field.update(player.x, player.y)
+
+        ids = store.ids(player.level)
+        distance = field.distances_at(store.x[ids], store.y[ids])
+        near = distance <= self.near
+        mid = ~near & (distance <= self.far) & (distance != UNREACHABLE)
+        return ids[near], ids[mid]
+
+    def step(self):
+        """
+        Run one simulation step.
+
+        Returns:
+            int: Number of entities that thought this step
+        """
+        self.ticks += 1
+        near, mid = self.bands()
+        mid = mid[(mid + self.ticks) % self.mid_interval == 0]
+        due = np.concatenate([near, mid])
+        if not due.size:
+            return 0
+
+        store = self.store
+        updated = store.updated[due]
+        updated[updated == NONE] = self.ticks - 1
+        missed = self.ticks - updated
+
+        # Entities back from being frozen: catch up on all but the last step
+        frozen = missed > self.mid_interval
+        if frozen.any():
+            self.advance(store, due[frozen], (missed[frozen] - 1) * self.timestep)
+            missed[frozen] = 1
+
+        store.updated[due] = self.ticks
+        self.think(store, due, missed * self.timestep)
+        return len(due)
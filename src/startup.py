@@ -0,0 +1,110 @@
+"""
+Startup profiling.
+
+StartupProfiler records how long each startup stage takes (imports, display,
+tileset, first frame) and, optionally, how long every module import takes by
+wrapping builtins.__import__ until stop() is called.
+
+Example:
+    profiler = StartupProfiler(time_imports=True)
+    with profiler.stage('imports'):
+        import pandas
+    profiler.stop()
+    print(profiler.report())
+"""
+import builtins
+import importlib.util
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler(object):
+    """
+    Times startup stages and module imports.
+
+    Attributes:
+        stages (list): (name, seconds) per stage, in order
+        imports (dict): Module name -> (inclusive seconds, self seconds) for
+            modules first imported while import timing was on
+    """
+
+    def __init__(self, time_imports=False):
+        """
+        Args:
+            time_imports: Time every module imported from now until stop()
+        """
+        self.start = time.perf_counter()
+        self.stages = []
+        self.imports = {}
+        self._original_import = None
+        if time_imports:
+            self._install()
+
+    @contextmanager
+    def stage(self, name):
+        """Context manager timing one startup stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def elapsed(self):
+        """Seconds since the profiler was created."""
+        return time.perf_counter() - self.start
+
+    def _install(self):
+        original = self._original_import = builtins.__import__
+        imports = self.imports
+        children = []  # Time spent in nested imports, one entry per open import
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            module = name
+            if level:
+                package = (globals or {}).get('__package__') or ''
+                try:
+                    module = importlib.util.resolve_name('.' * level + name, package)
+                except ImportError:
+                    pass
+            if module in sys.modules or module in imports:
+                return original(name, globals, locals, fromlist, level)
+
+            start = time.perf_counter()
+            children.append(0.0)
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = children.pop()
+                if children:
+                    children[-1] += elapsed
+                imports[module] = (elapsed, elapsed - nested)
+
+        builtins.__import__ = timed_import
+
+    def stop(self):
+        """Stop timing imports."""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def report(self, top=15):
+        """
+        Format the stage and import timings as a table.
+
+        Args:
+            top: Slowest imports to list (by inclusive time)
+        """
+        lines = [f"Startup: {self.elapsed() * 1000:.1f} ms", f"{'Stage':<40}{'ms':>10}"]
+        for name, seconds in self.stages:
+            lines.append(f"{name:<40}{seconds * 1000:>10.1f}")
+
+        if self.imports:
+            lines.append('')
+            lines.append(f"{'Import':<40}{'total ms':>10}{'self ms':>10}")
+            slowest = sorted(self.imports.items(), key=lambda item: item[1][0], reverse=True)
+            for module, (total, own) in slowest[:top]:
+                lines.append(f"{module:<40}{total * 1000:>10.1f}{own * 1000:>10.1f}")
+
+        return '\n'.join(lines)
@@ -0,0 +1,116 @@
+"""
+Per-level spatial trigger index (pressure plates, teleporters, pits, traps).
+
+Triggers are attached to cells for one of three events:
+
+- 'enter': the party steps onto the cell
+- 'leave': the party steps off the cell
+- 'facing': the party comes to face the cell (after a step or a turn)
+
+Each event has a dense list with one slot per cell (flat index
+y * width + x) holding that cell's triggers, so Player.move looks up
+triggers in O(1) however many a level has.
+
+Example:
+    triggers = level.trigger_index()
+    plate = triggers.add('enter', 12, 7, lambda event, cell, player: open_gate())
+    triggers.add('enter', 4, 4, lambda event, cell, player: player.set_pose(20, 3, 'S'))
+    triggers.remove(plate)
+"""
+from .player import MOVES
+
+
+# Trigger events, see TriggerIndex.add()
+EVENTS = ('enter', 'leave', 'facing')
+
+
+class TriggerIndex(object):
+    """
+    Triggers of one DungeonLevel by cell and event.
+
+    Player.move calls moved() after every successful move or turn; triggers
+    don't fire for Player.set_pose (so a teleporter's own set_pose doesn't
+    set off the destination's triggers) or Player.simulate.
+
+    Attributes:
+        width, height: Level size in cells
+    """
+
+    def __init__(self, level):
+        """
+        Args:
+            level: DungeonLevel (its clipping grid gives the size)
+        """
+        self.height = len(level.clipping)
+        self.width = max(len(row) for row in level.clipping)
+        self._cells = {event: [None] * (self.width * self.height) for event in EVENTS}
+
+    def _slot(self, event, x, y):
+        if event not in EVENTS:
+            raise ValueError(f"Unknown trigger event: {event}")
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"Cell ({x}, {y}) is outside the level")
+        return self._cells[event], y * self.width + x
+
+    def add(self, event, x, y, callback):
+        """
+        Attach a trigger to a cell.
+
+        Args:
+            event: 'enter', 'leave' or 'facing'
+            x, y: Cell
+            callback: Called with (event, (x, y), player) when the event happens
+
+        Returns:
+            tuple: Handle for remove()
+        """
+        cells, index = self._slot(event, x, y)
+        if cells[index] is None:
+            cells[index] = []
+        cells[index].append(callback)
+        return (event, x, y, callback)
+
+    def remove(self, handle):
+        """Detach a trigger added with add() (e.g. a one-shot trap that fired)."""
+        event, x, y, callback = handle
+        cells, index = self._slot(event, x, y)
+        cells[index].remove(callback)
+        if not cells[index]:
+            cells[index] = None
+
+    def at(self, event, x, y):
+        """Triggers attached to (x, y) for an event (a new list)."""
+        cells, index = self._slot(event, x, y)
+        return list(cells[index] or ())
+
+    def _fire(self, event, x, y, player):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            callbacks = self._cells[event][y * self.width + x]
+            if callbacks is not None:
+                # Copy so callbacks can remove themselves
+                for callback in tuple(callbacks):
+                    callback(event, (x, y), player)
+
+    def moved(self, player, before):
+        """
+        Fire the triggers for a move from the pose before to the player's pose.
+
+        'leave' fires for the old cell and 'enter' for the new one if the
+        cell changed, then 'facing' for the cell in front of the player if
+        that changed (read after the enter triggers, which may have moved
+        the player).
+
+        Args:
+            player: The Player, already at its new pose
+            before: (x, y, direction) before the move
+        """
+        x, y, direction = before
+        if (player.x, player.y) != (x, y):
+            self._fire('leave', x, y, player)
+            self._fire('enter', player.x, player.y, player)
+
+        dx, dy, _ = MOVES['w', direction]
+        front = (x + dx, y + dy)
+        dx, dy, _ = MOVES['w', player.direction]
+        if (player.x + dx, player.y + dy) != front:
+            self._fire('facing', player.x + dx, player.y + dy, player)
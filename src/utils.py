@@ -1,9 +1,21 @@
 import os
+import time
+import numpy as np
 import pygame as pg
 
 # Global scale factor for rendering (original 320x200 scaled up)
 SCALE_FACTOR = 3
 
+# Sprite storage modes, see prepare_surface()
+SURFACE_MODES = ('colorkey_rle', 'convert', 'convert_alpha')
+
+# Opt-in storage mode: 8-bit surfaces indexing a shared palette (never picked
+# by calibrate_surface_mode(), see build_palette())
+PALETTE_MODE = 'palette'
+
+# Transparent colour; always palette index 0
+COLORKEY = (255, 0, 255)
+
 
 def import_image(assetClass, fileName, scaleFactor=None, flip=False):
     """
@@ -28,7 +40,7 @@ def import_image(assetClass, fileName, scaleFactor=None, flip=False):
         img_size = (img.get_width() * scaleFactor, img.get_height() * scaleFactor)
         img = pg.transform.scale(img, img_size)
 
-    img.set_colorkey((255, 0, 255), pg.RLEACCEL)
+    img.set_colorkey(COLORKEY, pg.RLEACCEL)
     img = img.convert()
 
     return img
@@ -54,13 +66,163 @@ def sub_image(image, loc_size, scaleFactor=None, flip=False):
         loc_size[3] * scaleFactor
     )
     img = pg.Surface(loc_size[2:])
-    img.fill((255, 0, 255))
+    img.fill(COLORKEY)
     img.blit(image, (0, 0), loc_size)
 
     if flip:
         img = pg.transform.flip(img, True, False)
 
-    img.set_colorkey((255, 0, 255), pg.RLEACCEL)
+    img.set_colorkey(COLORKEY, pg.RLEACCEL)
     return img
 
 
+def surface_bytes(surface):
+    """Return the size of a surface's pixel buffer in bytes."""
+    return surface.get_pitch() * surface.get_height()
+
+
+def _rgb_codes(image):
+    """Return a surface's pixels as packed 0xRRGGBB ints, shape (width, height)."""
+    rgb = pg.surfarray.array3d(image).astype(np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def build_palette(images):
+    """
+    Build a palette holding every colour used by a set of sprites.
+
+    The wallsets are 256-colour art, so an environment's sprites fit one
+    palette. The colorkey is index 0.
+
+    Args:
+        images: Sprites (magenta is transparent)
+
+    Returns:
+        list: Up to 256 (r, g, b) colours
+
+    Raises:
+        ValueError: If the sprites use more than 256 colours
+    """
+    key = (COLORKEY[0] << 16) | (COLORKEY[1] << 8) | COLORKEY[2]
+    codes = np.unique(np.concatenate([_rgb_codes(img).ravel() for img in images] + [[key]]))
+    codes = [key] + [int(c) for c in codes if c != key]
+    if len(codes) > 256:
+        raise ValueError(f"Sprites use {len(codes)} colours, more than a palette holds")
+    return [((c >> 16) & 0xFF, (c >> 8) & 0xFF, c & 0xFF) for c in codes]
+
+
+def palettize(image, palette):
+    """
+    Convert a sprite to an 8-bit surface indexing a palette.
+
+    Colours are matched exactly (SDL's own 24-to-8-bit blit quantizes).
+
+    Args:
+        image: The sprite (magenta is transparent)
+        palette: build_palette() result containing every colour of the sprite
+
+    Returns:
+        8-bit surface with the palette and an RLE colorkey on index 0
+    """
+    codes = np.array([(r << 16) | (g << 8) | b for r, g, b in palette], dtype=np.uint32)
+    order = np.argsort(codes)
+    pixels = _rgb_codes(image)
+
+    indices = order[np.searchsorted(codes, pixels, sorter=order)]
+    surface = pg.Surface(image.get_size(), depth=8)
+    surface.set_palette(palette)
+    pg.surfarray.blit_array(surface, indices.astype(np.uint8))
+    surface.set_colorkey(0, pg.RLEACCEL)
+    return surface
+
+
+def shade_palette(palette, factor, tint=(0, 0, 0)):
+    """
+    Scale a palette's colours towards a tint, leaving the colorkey alone.
+
+    Swapping in a shaded palette (see DungeonTileset.apply_palette) dims or
+    flashes every sprite that uses it without touching pixels.
+
+    Args:
+        palette: List of (r, g, b)
+        factor: 1.0 keeps the colours, 0.0 gives the tint, above 1 brightens
+        tint: Colour shaded towards (black dims; white with factor < 1 flashes)
+
+    Returns:
+        list: The shaded palette
+    """
+    shaded = [palette[0]]
+    for colour in palette[1:]:
+        shaded.append(tuple(
+            max(0, min(255, int(round(t + (c - t) * factor)))) for c, t in zip(colour, tint)
+        ))
+    return shaded
+
+
+def prepare_surface(image, mode, palette=None):
+    """
+    Convert a magenta-colorkeyed sprite to a storage mode.
+
+    Args:
+        image: The sprite to convert (magenta is transparent)
+        mode: One of SURFACE_MODES or PALETTE_MODE:
+            'colorkey_rle' - display format, colorkey with RLE acceleration
+            'convert' - display format, plain colorkey
+            'convert_alpha' - display format with per-pixel alpha
+            'palette' - 8-bit indexes into palette, RLE colorkey (see palettize())
+        palette: The shared palette, for PALETTE_MODE
+
+    Returns:
+        The converted surface. Requires the display mode to be set.
+    """
+    if mode == PALETTE_MODE:
+        return palettize(image, palette)
+    if mode == 'colorkey_rle':
+        image.set_colorkey(COLORKEY, pg.RLEACCEL)
+        return image.convert()
+    if mode == 'convert':
+        image.set_colorkey(COLORKEY)
+        return image.convert()
+    if mode == 'convert_alpha':
+        image.set_colorkey(COLORKEY)
+        return image.convert_alpha()
+    raise ValueError(f"Unknown surface mode: {mode}")
+
+
+def calibrate_surface_mode(images, repeats=3):
+    """
+    Find the fastest storage mode for blitting a set of sprites to the display.
+
+    Each mode in SURFACE_MODES is timed by blitting every sprite onto a
+    display-format surface; the best of several runs is kept for each mode.
+
+    Args:
+        images: The sprites to benchmark (magenta is transparent)
+        repeats: Timed runs per mode
+
+    Returns:
+        tuple: (fastest mode, {mode: seconds per pass over all sprites})
+    """
+    target = pg.Surface((
+        max(img.get_width() for img in images),
+        max(img.get_height() for img in images)
+    )).convert()
+
+    timings = {}
+    for mode in SURFACE_MODES:
+        converted = [prepare_surface(img.copy(), mode) for img in images]
+
+        # Untimed pass first so RLE encoding (done on first blit) isn't counted
+        for img in converted:
+            target.blit(img, (0, 0))
+
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for img in converted:
+                target.blit(img, (0, 0))
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[mode] = best
+
+    return min(timings, key=timings.get), timings
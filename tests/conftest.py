@@ -0,0 +1,21 @@
+"""
+Shared fixtures for the tests.
+
+Run from the project root with: python -m pytest tests
+"""
+import importlib
+import os
+import sys
+
+import pytest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import levels.sewer
+
+
+@pytest.fixture
+def dungeon():
+    """A fresh Sewer dungeon (levels/sewer.py re-run so no state is shared)."""
+    return importlib.reload(levels.sewer).dungeon
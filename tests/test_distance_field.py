@@ -0,0 +1,62 @@
+"""Tests for src/distance_field.py."""
+import numpy as np
+
+from src.distance_field import UNREACHABLE, DistanceField
+from src.player import Player
+
+
+def test_door_under_party_closes_and_reopens(dungeon):
+    """A lever on the party's own door cell: the field recovers on reopening."""
+    level = dungeon.levels[0]
+    player = Player(dungeon)
+    player.set_pose(14, 9, 'N')
+    field = level.distance_field()
+    field.update(14, 9)
+    expected = field.distances.copy()
+
+    for _ in range(2):
+        door = player.click_switch(level.switches, level.adornments, level.clipping)
+        level.door_changed(*door)
+
+    assert field.distance(14, 10) == 1
+    assert (field.distances == expected).all()
+
+
+def test_incremental_matches_recompute(dungeon):
+    """Toggling every switch from its own cell gives the same field as a rebuild."""
+    level = dungeon.levels[0]
+    player = Player(dungeon)
+    field = level.distance_field()
+
+    for _ in range(2):
+        for (_, x, y, direction) in level.switches:
+            player.set_pose(x, y, direction)
+            field.update(x, y)
+            door = player.click_switch(level.switches, level.adornments, level.clipping)
+            level.door_changed(*door)
+
+            fresh = DistanceField(level)
+            fresh.update(x, y)
+            assert (field.distances == fresh.distances).all()
+
+
+def test_limited_field_matches_exact_within_limit(dungeon):
+    """A limited field agrees with the full one up to the limit, through steps and doors."""
+    level = dungeon.levels[0]
+    player = Player(dungeon)
+    limited = DistanceField(level, limit=4)
+
+    for (_, x, y, direction) in level.switches:
+        player.set_pose(x, y, direction)
+        limited.update(x, y)
+        door = player.click_switch(level.switches, level.adornments, level.clipping)
+        level.door_changed(*door)
+        for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+            if level.clipping[y + dy][x + dx] in (0, 2):
+                limited.update(x + dx, y + dy)
+                break
+
+        exact = DistanceField(level)
+        exact.update(*limited.source)
+        expected = np.where(exact.distances > 4, UNREACHABLE, exact.distances)
+        assert (limited.distances == expected).all()
@@ -0,0 +1,37 @@
+"""Tests for src/entities.py."""
+import pytest
+
+from src.entities import EntityStore
+
+
+def test_move_despawned(dungeon):
+    """Moving a despawned entity is refused and leaves the occupancy alone."""
+    store = EntityStore(dungeon.levels)
+    entity = store.spawn(0, 7, 12, solid=True)
+    store.despawn(entity)
+    with pytest.raises(ValueError):
+        store.move(entity, 7, 13)
+    assert store.at(0, 7, 13) == []
+    assert dungeon.levels[0].occupancy.occupants(7, 12) == 0
+
+
+@pytest.mark.parametrize('x, y', [(-1, 5), (5, -1), (30, 5), (5, 30)])
+def test_cells_outside_level(dungeon, x, y):
+    """spawn() and move() refuse cells outside the level."""
+    store = EntityStore(dungeon.levels)
+    with pytest.raises(ValueError):
+        store.spawn(0, x, y)
+    entity = store.spawn(0, 7, 12)
+    with pytest.raises(ValueError):
+        store.move(entity, x, y)
+    assert store.at(0, 7, 12) == [entity]
+
+
+def test_despawn_twice(dungeon):
+    """Despawning a dead entity raises ValueError, like move()."""
+    store = EntityStore(dungeon.levels)
+    entity = store.spawn(0, 7, 12)
+    store.despawn(entity)
+    with pytest.raises(ValueError):
+        store.despawn(entity)
+    assert len(store) == 0
@@ -0,0 +1,25 @@
+"""Tests for src/item_index.py and dungeon_view.view_cells()."""
+import pytest
+
+from src.dungeon_view import PANEL_OFFSETS, panel_cell, view_cells
+from src.item_index import ItemIndex
+
+
+@pytest.mark.parametrize('direction', 'NESW')
+def test_view_cells_cover_every_panel(direction):
+    """Every panel's cell is in view, far side columns included, nearest first."""
+    cells = view_cells(10, 10, direction)
+    assert len(cells) == len(set(cells)) == 16
+    for panel in PANEL_OFFSETS:
+        dx, dy = panel_cell(panel, direction)
+        assert (10 + dx, 10 + dy) in cells
+    assert cells[0] == (10, 10)
+
+
+def test_in_view_far_side_column(dungeon):
+    """Items in the FF3/KF3 cells (two to the side at depth 3) are in view."""
+    items = ItemIndex(dungeon.levels[0])
+    items.drop(12, 7, 0, 'dagger')      # two left, three ahead facing N from (14, 10)
+    items.drop(16, 7, 1, 'rock')        # two right
+    found = [cell for cell, _ in items.in_view(14, 10, 'N')]
+    assert found == [(12, 7), (16, 7)]
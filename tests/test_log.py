@@ -0,0 +1,42 @@
+"""Tests for src/log.py."""
+import io
+import logging
+import logging.handlers
+
+from src import log
+
+
+def test_bad_pob_log_entries_are_skipped(monkeypatch):
+    """Unknown levels or categories in POB_LOG warn instead of stopping startup."""
+    monkeypatch.setenv('POB_LOG', 'movement=verbose,sound=debug,render=debug')
+    stream = io.StringIO()
+    log.shutdown()
+    try:
+        log.configure(stream=stream)
+    finally:
+        log.shutdown()
+
+    assert log.get_logger('render').level == logging.DEBUG
+    assert log.get_logger('movement').level == log.DEFAULT_LEVELS['movement']
+    assert 'movement=verbose' in stream.getvalue()
+    assert 'sound=debug' in stream.getvalue()
+
+
+def test_records_after_shutdown_are_written(monkeypatch):
+    """After shutdown() records go straight to the stream, and configure() restarts the queue."""
+    monkeypatch.delenv('POB_LOG', raising=False)
+    stream = io.StringIO()
+    log.configure(stream=stream)
+    log.shutdown()
+    root = logging.getLogger('pob')
+    assert not any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers)
+
+    log.get_logger('load').warning("late")
+    assert 'late' in stream.getvalue()
+
+    log.configure(stream=stream)
+    log.get_logger('load').warning("queued")
+    log.shutdown()
+    assert 'queued' in stream.getvalue()
+    assert not any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers)
+    assert stream.getvalue().count('late') == 1
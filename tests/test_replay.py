@@ -0,0 +1,78 @@
+"""Tests for src/replay.py."""
+import importlib
+
+import levels.sewer
+from src.distance_field import DistanceField
+from src.player import Player
+from src.replay import InputRecorder, ReplayRunner, restore, snapshot
+from src.save import load_game, save_game, track
+
+
+def test_restore_notifies_listeners(dungeon):
+    """restore() passes changed doors to the level's services and change tracker."""
+    level = dungeon.levels[0]
+    player = Player(dungeon)
+    _, x, y, direction = next(iter(level.switches))
+    player.set_pose(x, y, direction)
+    door = player.click_switch(level.switches, level.adornments, level.clipping)
+    state = snapshot(dungeon, player.dungeon_pos)
+
+    other = importlib.reload(levels.sewer).dungeon
+    track(other)
+    level = other.levels[0]
+    field = level.distance_field()
+    field.update(x, y)
+    occupancy = level.occupancy_grid()
+    restore(other, state)
+
+    fresh = DistanceField(level)
+    fresh.update(x, y)
+    assert (field.distances == fresh.distances).all()
+    assert occupancy.passable(*door) == (level.clipping[door[1]][door[0]] not in (1, 3))
+    cells, _ = level.changes.delta()
+    assert [(cx, cy) for cx, cy, _ in cells] == [door]
+    assert level.clipping == dungeon.levels[0].clipping
+    assert level.adornments == dungeon.levels[0].adornments
+
+
+def test_quickload_replays(tmp_path):
+    """A replay of a session with a quickload ends where the session did."""
+    # ReplayRunner imports the dungeon module, so record against that dungeon
+    dungeon = importlib.reload(levels.sewer).dungeon
+    track(dungeon)
+    level = dungeon.levels[0]
+    player = Player(dungeon)
+    path = tmp_path / 'session.pobr'
+    recorder = InputRecorder(str(path), dungeon, player.dungeon_pos)
+    tick = 0
+
+    def press(key):
+        nonlocal tick
+        tick += 1
+        recorder.record(tick, key)
+        if key == 'space':
+            door = player.click_switch(level.switches, level.adornments, level.clipping)
+            if door is not None:
+                level.door_changed(*door)
+        elif key in 'wsadqe':
+            player.move(level.clipping, key)
+
+    _, x, y, direction = next(iter(level.switches))
+    player.set_pose(x, y, direction)
+    recorder.header['state'] = snapshot(dungeon, player.dungeon_pos)
+    save_game(tmp_path / 'quick.pobs', dungeon, player)
+    for key in ('space', 's', 'e'):
+        press(key)
+    press('f9')
+    load_game(tmp_path / 'quick.pobs', dungeon, player)
+    recorder.loaded(dungeon, player.dungeon_pos)
+    press('q')
+    recorder.close()
+    clipping, pose = [row[:] for row in level.clipping], player.dungeon_pos
+
+    importlib.reload(levels.sewer)
+    runner = ReplayRunner(str(path), render=False)
+    runner.run()
+    assert runner.player.dungeon_pos == pose
+    assert runner.dungeon.levels[0].clipping == clipping
+    assert len(runner.timings['load']) == 1
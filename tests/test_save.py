@@ -0,0 +1,80 @@
+"""Tests for src/save.py."""
+import importlib
+
+import pytest
+
+import levels.sewer
+
+from src.entities import EntityStore
+from src.player import Player
+from src.save import load_game, save_game, track
+
+
+def _pull(player, level, switch):
+    _, x, y, direction = switch
+    player.set_pose(x, y, direction)
+    level.door_changed(*player.click_switch(level.switches, level.adornments, level.clipping))
+
+
+def test_round_trip(dungeon, tmp_path):
+    """Loading puts doors, levers, pose and entities back as saved."""
+    track(dungeon)
+    level = dungeon.levels[0]
+    player = Player(dungeon)
+    store = EntityStore(dungeon.levels)
+    switches = list(level.switches)
+    for switch in switches[:2]:
+        _pull(player, level, switch)
+    store.spawn(0, 7, 12, type=3, hp=9, solid=True)
+    clipping, adornments = [row[:] for row in level.clipping], dict(level.adornments)
+    pose = player.dungeon_pos
+    path = tmp_path / 'game.pobs'
+    save_game(path, dungeon, player, store)
+
+    for switch in switches[:3]:
+        _pull(player, level, switch)
+    store.spawn(0, 8, 13, solid=True)
+    load_game(path, dungeon, player, store)
+
+    assert level.clipping == clipping
+    assert level.adornments == adornments
+    assert player.dungeon_pos == pose
+    assert store.at(0, 7, 12) == [0] and len(store) == 1
+    assert level.occupancy.occupants(8, 13) == 0
+
+
+def test_truncated_file(dungeon, tmp_path):
+    """A cut-short save raises ValueError and leaves the dungeon unchanged."""
+    track(dungeon)
+    level = dungeon.levels[0]
+    player = Player(dungeon)
+    _pull(player, level, next(iter(level.switches)))
+    path = tmp_path / 'game.pobs'
+    save_game(path, dungeon, player)
+
+    _pull(player, level, next(iter(level.switches)))
+    clipping, pose = [row[:] for row in level.clipping], player.dungeon_pos
+    data = path.read_bytes()
+    for size in (3, 8, len(data) // 2, len(data) - 1):
+        path.write_bytes(data[:size])
+        with pytest.raises(ValueError):
+            load_game(path, dungeon, player)
+        assert level.clipping == clipping and player.dungeon_pos == pose
+
+
+def test_other_levels(dungeon, tmp_path):
+    """A save made from different level content is refused."""
+    track(dungeon)
+    path = tmp_path / 'game.pobs'
+    save_game(path, dungeon, Player(dungeon))
+    other = importlib.reload(levels.sewer).dungeon
+    other.levels[0].walls_x[0][0] = 'Q'
+    with pytest.raises(ValueError, match='differs'):
+        load_game(path, other, Player(other))
+
+
+def test_tracking_is_opt_in(dungeon):
+    """Levels only track changes once track() (or change_tracker()) is called."""
+    assert all(level.changes is None for level in dungeon.levels)
+    track(dungeon)
+    assert all(level.changes is not None for level in dungeon.levels)
@@ -0,0 +1,337 @@
+"""
+Reachability Walker Tool
+
+Walks every (x, y, direction) the player can reach on a level, starting at
+the dungeon's entry position, and renders each view headlessly through the
+real DungeonView/Game path. Reports per-view render time, blit count and
+missing tile lookups (DungeonTileset.image() returning None), and draws a
+heatmap of the slowest cells.
+
+With --switches the walk also covers cells behind doors the player can open,
+and renders each view with every combination of states of the switches
+(doors and levers) visible from it. Poses that produce identical views are
+rendered once.
+
+Usage:
+    python tools/reachability.py                  # doors as they start
+    python tools/reachability.py --switches       # every reachable switch state
+    python tools/reachability.py --csv views.csv --png heatmap.png
+"""
+
+import argparse
+import csv
+import itertools
+import statistics
+import sys
+import os
+import time
+
+# Output paths are relative to where the tool was started
+LAUNCH_DIR = os.getcwd()
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.chdir(os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame as pg
+
+from src.dungeon_view import DungeonView, PANEL_OFFSETS
+from src.env import init_headless
+from src.game import Game
+from src.player import Player, BLOCKING
+from levels.sewer import dungeon
+
+
+# Heatmap characters, coolest to hottest
+HEAT_CHARS = '.:-=+*#%@'
+
+# Heatmap PNG cell size in pixels
+CELL_SIZE = 16
+
+
+class CountingSurface(object):
+    """Wraps a Surface and counts the blits made onto it."""
+
+    def __init__(self, surface):
+        self.surface = surface
+        self.blits = 0
+
+    def blit(self, *args, **kwargs):
+        self.blits += 1
+        return self.surface.blit(*args, **kwargs)
+
+
+def switch_states(level, level_index):
+    """
+    Work out the states each switch can be in.
+
+    Throwing a switch toggles its door and sets its lever adornment, so a
+    switch cycles through its starting state and the states reached by
+    throwing it repeatedly (found with Player.click_switch on copies).
+
+    Returns:
+        dict: Switch key -> list of (door value, lever adornment), starting
+        with the level's current state
+    """
+    player = Player(dungeon)
+    player.level = level_index
+    states = {}
+
+    for key, ((door_y, door_x), lever) in level.switches.items():
+        clipping = [list(row) for row in level.clipping]
+        adornments = dict(level.adornments)
+        player.set_pose(*key[1:])
+
+        cycle = []
+        state = (clipping[door_y][door_x], adornments.get(tuple(lever)))
+        while state not in cycle:
+            cycle.append(state)
+            player.click_switch(level.switches, adornments, clipping)
+            state = (clipping[door_y][door_x], adornments.get(tuple(lever)))
+        states[key] = cycle
+
+    return states
+
+
+def walk(level, level_index, start, use_switches=False):
+    """
+    List every reachable pose and the switch states to render it with.
+
+    Poses are every direction in every cell reachable from start (see
+    DungeonLevel.reachable_cells). With use_switches, cells behind doors
+    the player can open are included and each pose is paired with every
+    combination of states of the switches visible from it (whose door cell
+    or lever is within the view), so every distinct view is covered without
+    walking the full product of all switch states.
+
+    Args:
+        level: DungeonLevel to walk
+        level_index: Index of the level in the dungeon (switch keys include it)
+        start: Starting (x, y, direction)
+        use_switches: Include switch states
+
+    Returns:
+        list: (x, y, direction, combo) where combo is a tuple of
+        (switch key, state index) pairs; empty means the level as it is
+    """
+    x, y, _ = start
+    states = switch_states(level, level_index) if use_switches else {}
+    poses = []
+
+    for cx, cy in level.reachable_cells(x, y, use_switches=use_switches):
+        for direction in 'NESW':
+            cells = {
+                (cx + offsets[direction][0], cy + offsets[direction][1])
+                for offsets in PANEL_OFFSETS.values()
+            }
+            visible = [
+                key for key, ((door_y, door_x), lever) in level.switches.items()
+                if key in states and ((door_x, door_y) in cells or tuple(lever[1:]) in cells)
+            ]
+            for combo in itertools.product(*(range(len(states[key])) for key in visible)):
+                poses.append((cx, cy, direction, tuple(zip(visible, combo))))
+
+    return poses, states
+
+
+def missing_tiles(game):
+    """
+    Find the tile lookups in the current view that have no image.
+
+    Returns:
+        list: (panel, dungeon_map_code) pairs for which image() is None
+    """
+    view = game.dungeon_view
+    missing = []
+    for panel in view.panels:
+        base, overlays = game._panel_layers(panel)
+        for code in ((base,) if base is not None else ()) + overlays:
+            if view.dungeon_tileset.image(view.environment, code, panel) is None:
+                missing.append((panel, code))
+    return missing
+
+
+def render_views(level, poses, states, repeat=3):
+    """
+    Render every distinct view among the poses.
+
+    Args:
+        level: The DungeonLevel walked
+        poses: walk() poses
+        states: walk() switch states
+        repeat: Timed renders per view (after one untimed first render)
+
+    Returns:
+        list: One dict per pose with x, y, direction, switches (description
+        of the combo), view (index of the distinct view), first_ms (first
+        render, building merged stacks), ms (median of the timed renders),
+        blits and missing
+    """
+    init_headless()
+    player = Player(dungeon)
+    game = Game(player)
+    game.dungeon_view_init(DungeonView(level.environment))
+    frame = CountingSurface(pg.Surface(game.window_size).convert())
+
+    clipping = [list(row) for row in level.clipping]
+    adornments = dict(level.adornments)
+    views = {}
+    records = []
+
+    for x, y, direction, combo in poses:
+        # Put the visible switches in this pose's states
+        for key, index in combo:
+            (door_y, door_x), lever = level.switches[key]
+            clipping[door_y][door_x], adornments[tuple(lever)] = states[key][index]
+
+        player.set_pose(x, y, direction)
+        game.dungeon_view.update_panels(
+            (x, y, direction), level.walls_x, level.walls_y, adornments, clipping,
+            swap_background=False
+        )
+
+        # Back to the level as it is
+        for key, _ in combo:
+            (door_y, door_x), lever = level.switches[key]
+            clipping[door_y][door_x], adornments[tuple(lever)] = states[key][0]
+
+        signature = (
+            direction,
+            tuple(game.dungeon_view.tiles.items()),
+            tuple(game.dungeon_view.adornment_panels.items()),
+        )
+        if signature not in views:
+            frame.blits = 0
+            start = time.perf_counter()
+            game.render_scene(frame)
+            first = time.perf_counter() - start
+            blits = frame.blits
+
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                game.render_scene(frame)
+                times.append(time.perf_counter() - start)
+
+            views[signature] = {
+                'view': len(views),
+                'first_ms': first * 1000,
+                'ms': statistics.median(times) * 1000,
+                'blits': blits,
+                'missing': missing_tiles(game),
+            }
+
+        switches = ' '.join(
+            f"{key[1]},{key[2]},{key[3]}={states[key][index][0]}/{states[key][index][1]}"
+            for key, index in combo
+        )
+        records.append(dict(x=x, y=y, direction=direction, switches=switches, **views[signature]))
+
+    return records
+
+
+def cell_times(records):
+    """Slowest view time (ms) per (x, y) cell."""
+    times = {}
+    for record in records:
+        cell = (record['x'], record['y'])
+        times[cell] = max(times.get(cell, 0.0), record['ms'])
+    return times
+
+
+def ascii_heatmap(level, times):
+    """
+    Draw the slowest view time per cell as text, one line per row of the
+    level (prefixed with y) between the first and last reached rows.
+
+    Unreached cells are blank; reached cells use HEAT_CHARS from the fastest
+    to the slowest time on the level.
+    """
+    low, high = min(times.values()), max(times.values())
+    span = (high - low) or 1.0
+    rows = [y for _, y in times]
+    lines = []
+    for y in range(min(rows), max(rows) + 1):
+        line = ''
+        for x in range(len(level.clipping[y])):
+            if (x, y) in times:
+                line += HEAT_CHARS[int((times[x, y] - low) / span * (len(HEAT_CHARS) - 1))]
+            else:
+                line += ' '
+        lines.append(f"{y:>3} {line.rstrip()}")
+    return '\n'.join(lines)
+
+
+def png_heatmap(level, times, path):
+    """Save the heatmap as an image: blocked cells grey, reached cells green (fast) to red (slow)."""
+    height, width = len(level.clipping), max(len(row) for row in level.clipping)
+    image = pg.Surface((width * CELL_SIZE, height * CELL_SIZE))
+    image.fill((0, 0, 0))
+
+    low, high = min(times.values()), max(times.values())
+    span = (high - low) or 1.0
+    for y, row in enumerate(level.clipping):
+        for x, value in enumerate(row):
+            rect = (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE - 1, CELL_SIZE - 1)
+            if (x, y) in times:
+                heat = (times[x, y] - low) / span
+                image.fill((int(255 * heat), int(255 * (1 - heat)), 0), rect)
+            elif value in BLOCKING:
+                image.fill((60, 60, 60), rect)
+    pg.image.save(image, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render every reachable view and time it')
+    parser.add_argument('--switches', action='store_true', help='cover cells behind openable doors and every visible switch state')
+    parser.add_argument('--repeat', type=int, default=3, help='timed renders per view')
+    parser.add_argument('--top', type=int, default=10, help='slowest views to list')
+    parser.add_argument('--csv', metavar='FILE', help='write one row per pose')
+    parser.add_argument('--png', metavar='FILE', help='save the heatmap as an image')
+    args = parser.parse_args()
+
+    level_index, x, y, direction = dungeon.entry_pos
+    level = dungeon.levels[level_index]
+
+    start = time.perf_counter()
+    poses, states = walk(level, level_index, (x, y, direction), use_switches=args.switches)
+    print(f"Walked {len(poses)} poses ({len(states)} switches, "
+          f"{time.perf_counter() - start:.2f}s)")
+
+    records = render_views(level, poses, states, repeat=args.repeat)
+    views = {record['view']: record for record in records}
+    print(f"Rendered {len(views)} distinct views")
+
+    print(f"\nSlowest views (median of {args.repeat} renders):")
+    print(f"{'ms':>8}{'first ms':>10}{'blits':>7}  pose")
+    for record in sorted(views.values(), key=lambda r: r['ms'], reverse=True)[:args.top]:
+        print(f"{record['ms']:>8.2f}{record['first_ms']:>10.2f}{record['blits']:>7}  "
+              f"({record['x']}, {record['y']}, {record['direction']}) {record['switches']}")
+
+    missing = sorted({lookup for record in views.values() for lookup in record['missing']})
+    print(f"\nMissing tile lookups: {len(missing)}")
+    for panel, code in missing:
+        print(f"    {panel}: {code!r}")
+
+    times = cell_times(records)
+    print(f"\nSlowest view per cell ({min(times.values()):.2f}ms '{HEAT_CHARS[0]}'"
+          f" to {max(times.values()):.2f}ms '{HEAT_CHARS[-1]}'):")
+    print(ascii_heatmap(level, times))
+
+    if args.csv:
+        with open(os.path.join(LAUNCH_DIR, args.csv), 'w', newline='') as f:
+            fields = ['x', 'y', 'direction', 'switches', 'view', 'ms', 'first_ms', 'blits', 'missing']
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for record in records:
+                writer.writerow(dict(record, missing=' '.join(f"{p}:{c}" for p, c in record['missing'])))
+        print(f"\nWrote {args.csv}")
+
+    if args.png:
+        png_heatmap(level, times, os.path.join(LAUNCH_DIR, args.png))
+        print(f"Wrote {args.png}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Replay Tool
+
+Replays an input recording made with `python main.py --record FILE` headlessly
+(no window) and reports how long each phase took.
+
+Usage:
+    python tools/replay.py session.pobr             # as fast as possible
+    python tools/replay.py session.pobr --realtime  # at the recorded pace
+    python tools/replay.py session.pobr --no-render # game logic only
+"""
+
+import argparse
+import sys
+import os
+
+# Recording paths are relative to where the tool was started
+LAUNCH_DIR = os.getcwd()
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.chdir(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.replay import ReplayRunner
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay an input recording headlessly')
+    parser.add_argument('recording', help='recording file from main.py --record')
+    parser.add_argument('--realtime', action='store_true', help='keep the recorded pace')
+    parser.add_argument('--no-render', action='store_true', help='skip viewport rendering')
+    args = parser.parse_args()
+
+    runner = ReplayRunner(
+        os.path.join(LAUNCH_DIR, args.recording),
+        render=not args.no_render,
+        realtime=args.realtime
+    )
+    summary = runner.run()
+
+    print(f"Replayed {len(runner.events)} events, final position {runner.player.dungeon_pos}")
+    print(f"{'Phase':<15}{'Count':>8}{'Total ms':>12}{'Mean us':>12}")
+    for phase, (count, total, mean) in summary.items():
+        print(f"{phase:<15}{count:>8}{total * 1000:>12.2f}{mean * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()